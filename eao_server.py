@@ -1,18 +1,95 @@
-from flask import Flask, request
+from __future__ import annotations
+import time
+startup_t0 = time.perf_counter()
+from flask import Flask, request, Response, g, has_request_context
 import json
-import eaopack as eao
 import logging
-import numpy as np
+import importlib
+import importlib.util
 import typing
 import copy
+import datetime as dt
+import uuid
+import threading
+import os
+import re
+import itertools
+import io
+import hashlib
+import sqlite3
+import pickle
+import contextlib
+import zlib
+import shutil
+import multiprocessing
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+## heavy packages (eaopack incl. cvxpy, pandas, numpy) are imported on first use
+startup_timing = dict() # seconds, see /get_startup_timing
+
+class LazyModule:
+    """ module imported on first attribute access """
+    def __init__(self, name):
+        self._name   = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            t0 = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            startup_timing['import '+self._name] = time.perf_counter() - t0
+        return getattr(self._module, attr)
+
+eao = LazyModule('eaopack')
+np  = LazyModule('numpy')
+pd  = LazyModule('pandas')
+nx  = LazyModule('networkx')
 
 ## standard info
 # parameters to be loaded from file or else, here for convenience as dict
 parameters = {}
 parameters['file_nodes']      = 'std_nodes.json'
 parameters['file_assets']     = 'std_assets.json'
-parameters['max_optim_steps'] = 96*5 # 5 days 15min
+# admission control by estimated problem cost: variables + constraints + integer_weight * integer variables
+parameters['max_cost_optimize'] = 1e6  # max cost for immediate optimization (/optimize, scenarios)
+parameters['max_cost_job']      = 2e7  # max cost for background jobs (/optimize_submit)
+parameters['integer_weight']    = 100
+parameters['estimate_steps']    = 96   # time steps set up to estimate problem size (scaled to timegrid)
+parameters['time_limit']        = None # default solver time limit (s). Per request: query parameter time_limit
+parameters['mip_gap']           = None # default relative MIP gap. Per request: query parameter mip_gap
 parameters['solver']          = 'standard'
+parameters['n_job_workers']   = 2   # background workers for optimization jobs
+parameters['max_jobs']        = 100 # finished jobs to keep (incl. results)
+parameters['job_recovery_interval'] = 10 # s, check for jobs of ended server processes (see recover_jobs)
+parameters['n_processes']     = None # processes for scenario optimization. None: number of cores
+parameters['result_cache_size'] = 200*2**20 # max memory for cached optimization results (bytes, estimated)
+parameters['problem_cache_entries'] = 4 # number of set up optimization problems kept for reuse
+parameters['max_workspaces']      = 100    # max number of workspaces (e.g. users)
+parameters['workspace_idle_time'] = 3600*8 # seconds. Idle workspaces are deleted
+# recorder backend: 'memory' (default, single process), 'files' (single process, persisted,
+# kept over restarts) or 'sqlite' (shared by several server processes on one host, e.g.
+# gunicorn workers). See data recorder
+parameters['recorder_backend'] = os.environ.get('EAO_RECORDER_BACKEND', 'memory')
+parameters['recorder_file']    = os.environ.get('EAO_RECORDER_FILE', 'eao_recorder.sqlite')
+parameters['recorder_dir']     = os.environ.get('EAO_RECORDER_DIR', 'eao_recorder')
+# lazy initialization: nothing is loaded at import (packages, std data on first use). Std data
+# is stored as given in files (prebuilt JSON) and only parsed when needed as objects
+parameters['lazy_init'] = os.environ.get('EAO_LAZY_INIT', '0') == '1'
+parameters['log_level'] = os.environ.get('EAO_LOG_LEVEL', 'DEBUG')
+# responses: compressed (gzip, zstd if package zstandard is installed) if accepted by client and
+# larger than compress_min_size. Large JSON responses are streamed in chunks (bytes)
+parameters['compress_min_size'] = 1024
+parameters['stream_min_size']   = 2**20
+parameters['stream_chunk_size'] = 2**16
+# job progress (/job_progress): number of events kept per job, polling interval of event stream (s)
+parameters['max_progress_events']    = 200
+parameters['progress_poll_interval'] = 0.2
+# network layout (get_network) after portfolio edits: spring layout iterations starting from previous positions
+parameters['network_seeded_iterations'] = 15
+# warm up: solve tiny portfolio at startup (background), see /ready
+parameters['warm_up']   = os.environ.get('EAO_WARM_UP', '0') == '1'
 
 ####
 # CVXPY (LP/ MIP optimization framework) should be installed with
@@ -23,19 +100,568 @@ parameters['solver']          = 'standard'
 # parameters['solver']          = None or leave without this key for default
 
 
-logging.basicConfig(filename='eao.log', encoding='utf-8', level=logging.DEBUG)
+logging.basicConfig(filename='eao.log', encoding='utf-8', level=getattr(logging, parameters['log_level']))
 logging.info('**** Hi! New eao ession')
 
 ################################################################
 ### data recorder
-# using global variables for data (until database is in place)
-data = dict()
-def recorder(key=None, in_data= None, reset:bool = False):
-    """ record data
+# data is kept in workspaces, separated namespaces e.g. for several users
+# the workspace is given by header X-Workspace or URL prefix /ws/<workspace id>/
+# (default workspace if not given).
+# Data is held by a recorder backend (parameters['recorder_backend']):
+#  * 'memory': dict in process memory (default)
+#  * 'files':  in process memory, persisted in directory parameters['recorder_dir'] (compressed
+#              blob per key). After restart, data is loaded on first access
+#  * 'sqlite': SQLite file parameters['recorder_file']. Several server processes on one host
+#              (e.g. gunicorn workers) share workspaces, data and jobs
+# Each stored key has a version, new with every write (unique across workspaces). Versions are
+# unique within the epoch of the backend (random id: per start for 'memory', stored for 'files' and
+# 'sqlite'), e.g. for ETags that remain valid over restarts only if data is kept
+# Per process and workspace, the following is cached with the version it was made from:
+#  * objects:  deserialized objects. Filled once when writing a key, so that read paths never
+#              parse twice. Cached objects are shared -- copy before manipulating them (also
+#              before setting up optimization problems, which changes portfolio and timegrid)
+#  * jsons:    JSON strings (e.g. built for data stored as object only)
+#  * digests:  hashes of stored data (computed on demand, see data_digest)
+# Requests on a workspace are processed one after the other (workspace lock, across processes
+# for shared backends). Keys starting with '_' hold settings of the workspace (e.g. solver)
+workspaces = dict() # local caches by workspace id
+workspaces_lock = threading.Lock()
+last_eviction = time.time()
+backend = None
+backend_lock = threading.Lock()
+
+def is_array_dict(value):
+    """ True for dict of numpy arrays (e.g. time series data from binary upload) """
+    return isinstance(value, dict) and all(isinstance(v, np.ndarray) for v in value.values())
+
+def encode_value(value, lazy):
+    """ stored value to bytes and format (for backends writing to disk) """
+    if isinstance(value, str):
+        return value.encode(), 'str'
+    if lazy:
+        if is_array_dict(value):
+            buffer = io.BytesIO()
+            np.savez(buffer, **value)
+            return buffer.getvalue(), 'npz'
+        return eao.serialization.to_json(value).encode(), 'str'
+    return json.dumps(value).encode(), 'json'
+
+def decode_value(value, format):
+    """ bytes and format to stored value and lazy """
+    if format == 'npz':
+        with np.load(io.BytesIO(value)) as f:
+            return {k: f[k] for k in f.files}, True
+    if format == 'json':
+        return json.loads(value), False
+    return value.decode(), False
+
+class MemoryBackend:
+    """ recorder backend keeping data in process memory (single process) """
+    def __init__(self):
+        self.data    = dict() # workspace id -> {key: (value, version, lazy)}
+        self.access  = dict() # workspace id -> last access
+        self.locks   = dict()
+        self.jobs    = dict()
+        self.job_inputs = dict()
+        self.lock    = threading.Lock()
+        self.counter = itertools.count(1)
+        self.epoch   = uuid.uuid4().hex # versions restart with each start
+
+    def create_workspace(self, ws_id, max_workspaces):
+        """ create workspace if needed and register access. Returns True if created """
+        with self.lock:
+            created = not ws_id in self.data
+            if created:
+                if len(self.data) >= max_workspaces:
+                    raise ValueError('max number of workspaces reached')
+                self.data[ws_id] = dict()
+            self.access[ws_id] = time.time()
+            return created
+
+    def delete_workspace(self, ws_id):
+        with self.lock:
+            self.data.pop(ws_id, None)
+            self.access.pop(ws_id, None)
+            self.locks.pop(ws_id, None) # holders keep their reference
+
+    def workspaces(self):
+        """ dict workspace id -> {last_access, keys} """
+        with self.lock:
+            return {k: {'last_access': self.access[k], 'keys': len([kk for kk in self.data[k] if not (kk.startswith('_') or ':' in kk)])}
+                    for k in self.data}
+
+    def workspace_lock(self, ws_id):
+        with self.lock:
+            return self.locks.setdefault(ws_id, threading.RLock())
+
+    def get(self, ws_id, key):
+        """ returns value, version (0 if not stored) and lazy (True: value is object to be serialized on demand) """
+        return self.data.get(ws_id, {}).get(key, (None, 0, False))
+
+    def version(self, ws_id, key):
+        return self.get(ws_id, key)[1]
+
+    def put(self, ws_id, key, value, lazy = False):
+        """ store value, returns new version """
+        with self.lock:
+            version = next(self.counter)
+            self.data.setdefault(ws_id, dict())[key] = (value, version, lazy)
+            return version
+
+    def keys(self, ws_id):
+        return list(self.data.get(ws_id, {}))
+
+    def delete(self, ws_id, key):
+        with self.lock:
+            self.data.get(ws_id, {}).pop(key, None)
+
+    def clear(self, ws_id):
+        """ delete all data of workspace (except settings starting with '_') """
+        with self.lock:
+            d = self.data.get(ws_id, {})
+            for k in [k for k in d if not k.startswith('_')]: del d[k]
+
+    def put_job(self, job_id, record, input = None):
+        """ store job record and input of job (e.g. snapshot of data, kept until dropped) """
+        with self.lock:
+            self.jobs[job_id] = dict(record)
+            if input is not None: self.job_inputs[job_id] = input
+
+    def get_job_input(self, job_id):
+        with self.lock:
+            return self.job_inputs.get(job_id)
+
+    def drop_job_input(self, job_id):
+        with self.lock:
+            self.job_inputs.pop(job_id, None)
+
+    def get_job(self, job_id, with_result = False):
+        """ job record as dict (None if not found). Result only if with_result """
+        with self.lock:
+            if not job_id in self.jobs: return None
+            record = dict(self.jobs[job_id])
+        if not with_result: record.pop('result', None)
+        return record
+
+    def update_job(self, job_id, func):
+        """ change job record by func(record) -> True if changed. Returns changed and record """
+        with self.lock:
+            record = dict(self.jobs[job_id])
+            changed = func(record)
+            if changed: self.jobs[job_id] = record
+        record = dict(record)
+        record.pop('result', None)
+        return changed, record
+
+    def job_list(self):
+        """ list of (job id, workspace, status) in order of submission """
+        with self.lock:
+            return [(k, j['workspace'], j['status']) for k, j in self.jobs.items()]
+
+    def delete_job(self, job_id):
+        with self.lock:
+            self.jobs.pop(job_id, None)
+            self.job_inputs.pop(job_id, None)
+
+class StoredBlob:
+    """ placeholder for data persisted on disk, but not loaded yet """
+    def __init__(self, path, format):
+        self.path   = path
+        self.format = format
+
+def fsync_dir(directory):
+    """ make changes of directory entries (rename, removal) durable """
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class FileBackend(MemoryBackend):
+    """ recorder backend keeping data in process memory, persisted in a directory (single process).
+        Each key is written atomically as compressed blob <workspace>/<key>.<version>.<format>.z
+        (key url-quoted). On startup only file names are read, data is loaded on first access """
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        self.paths     = dict() # workspace id -> {key: file}
+        os.makedirs(directory, exist_ok = True)
+        max_version = 0
+        for ws_id in os.listdir(directory):
+            ws_dir = os.path.join(directory, ws_id)
+            if not os.path.isdir(ws_dir): continue
+            self.data[ws_id]   = dict()
+            self.paths[ws_id]  = dict()
+            self.access[ws_id] = time.time() # last access not persisted -- restored workspaces count as accessed now
+            for f in os.listdir(ws_dir):
+                path  = os.path.join(ws_dir, f)
+                parts = f.split('.')
+                if (len(parts) != 4) or (parts[3] != 'z'): # e.g. temp file of interrupted write
+                    os.remove(path)
+                    continue
+                key, version, format = urllib.parse.unquote(parts[0]), int(parts[1]), parts[2]
+                if key in self.data[ws_id]: # older version left by interrupted write
+                    if self.data[ws_id][key][1] > version:
+                        os.remove(path)
+                        continue
+                    os.remove(self.paths[ws_id][key])
+                self.data[ws_id][key]  = (StoredBlob(path, format), version, format == 'npz')
+                self.paths[ws_id][key] = path
+                max_version = max(max_version, version)
+        self.counter = itertools.count(max_version+1)
+        epoch_file = os.path.join(directory, '.epoch') # not a workspace id
+        if os.path.isfile(epoch_file):
+            with open(epoch_file) as f: self.epoch = f.read().strip()
+        else: # new directory (or of earlier version) -- keep epoch of this start
+            with open(epoch_file+'.tmp', 'w') as f:
+                f.write(self.epoch)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(epoch_file+'.tmp', epoch_file)
+            fsync_dir(directory)
+        logging.info('recorder: found '+str(len(self.data))+' workspaces in '+directory)
+
+    def get(self, ws_id, key):
+        value, version, lazy = super().get(ws_id, key)
+        if isinstance(value, StoredBlob):
+            with open(value.path, 'rb') as f:
+                value, lazy = decode_value(zlib.decompress(f.read()), value.format)
+            with self.lock:
+                if self.data.get(ws_id, {}).get(key, (None, 0))[1] == version:
+                    self.data[ws_id][key] = (value, version, lazy)
+        return value, version, lazy
+
+    def put(self, ws_id, key, value, lazy = False):
+        """ write blob (temp file, fsync, rename, fsync directory), then publish new version in memory """
+        b, format = encode_value(value, lazy)
+        ws_dir = os.path.join(self.directory, ws_id)
+        if not os.path.isdir(ws_dir):
+            os.makedirs(ws_dir, exist_ok = True)
+            fsync_dir(self.directory)
+        with self.lock:
+            version = next(self.counter)
+        path = os.path.join(ws_dir, urllib.parse.quote(key, safe = '').replace('.', '%2E')+'.'+str(version)+'.'+format+'.z')
+        try:
+            with open(path+'.tmp', 'wb') as f:
+                f.write(zlib.compress(b, 1))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path+'.tmp', path) # atomic
+            fsync_dir(ws_dir)             # rename durable
+        except: # nothing published -- no file of this version must remain
+            for f in (path+'.tmp', path):
+                if os.path.exists(f): os.remove(f)
+            raise
+        with self.lock:
+            current = self.data.setdefault(ws_id, dict()).get(key, (None, 0, False))[1]
+            if version > current:
+                self.data[ws_id][key] = (value, version, lazy)
+                old = self.paths.setdefault(ws_id, dict()).get(key)
+                self.paths[ws_id][key] = path
+            else: # newer version written meanwhile
+                old = path
+        if old is not None:
+            os.remove(old)
+            fsync_dir(ws_dir)
+        return version
+
+    def remove_blob(self, ws_id, key):
+        """ remove file of key """
+        with self.lock:
+            path = self.paths.get(ws_id, {}).pop(key, None)
+        if path is not None: os.remove(path)
+
+    def delete(self, ws_id, key):
+        super().delete(ws_id, key)
+        self.remove_blob(ws_id, key)
+
+    def clear(self, ws_id):
+        keys = [k for k in self.keys(ws_id) if not k.startswith('_')]
+        super().clear(ws_id)
+        for k in keys:
+            self.remove_blob(ws_id, k)
+
+    def delete_workspace(self, ws_id):
+        super().delete_workspace(ws_id)
+        with self.lock:
+            self.paths.pop(ws_id, None)
+        shutil.rmtree(os.path.join(self.directory, ws_id), ignore_errors = True)
+
+class WorkspaceLock:
+    """ lock on a workspace across threads and processes (lock file, unix only) """
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.rlock     = threading.RLock()
+        self.count     = 0
+        self.fd        = None
+
+    def acquire(self, blocking = True):
+        import fcntl
+        if not self.rlock.acquire(blocking): return False
+        if self.count == 0:
+            fd = os.open(self.file_name, os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                self.rlock.release()
+                return False
+            self.fd = fd
+        self.count += 1
+        return True
+
+    def release(self):
+        import fcntl
+        self.count -= 1
+        if self.count == 0:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+        self.rlock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+class SQLiteBackend:
+    """ recorder backend keeping data in a SQLite file, shared by processes on one host.
+        Same interface as MemoryBackend """
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.lock_dir  = file_name+'.locks'
+        os.makedirs(self.lock_dir, exist_ok = True)
+        self.local = threading.local() # connection per thread
+        self.locks = dict()
+        self.lock  = threading.Lock()
+        with self.transaction() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS data (ws TEXT, key TEXT, value BLOB, format TEXT, version INTEGER, PRIMARY KEY (ws, key))')
+            con.execute('CREATE TABLE IF NOT EXISTS workspaces (ws TEXT PRIMARY KEY, last_access REAL)')
+            con.execute('CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, workspace TEXT, status TEXT, submitted REAL, record BLOB, result BLOB, input BLOB)')
+            if not 'input' in [r[1] for r in con.execute('PRAGMA table_info(jobs)')]: # file of earlier version
+                con.execute('ALTER TABLE jobs ADD COLUMN input BLOB')
+            con.execute('CREATE TABLE IF NOT EXISTS counter (id INTEGER PRIMARY KEY, version INTEGER)')
+            con.execute('INSERT OR IGNORE INTO counter VALUES (0, 0)')
+            con.execute('CREATE TABLE IF NOT EXISTS epoch (id INTEGER PRIMARY KEY, epoch TEXT)')
+            con.execute('INSERT OR IGNORE INTO epoch VALUES (0, ?)', (uuid.uuid4().hex,))
+            self.epoch = con.execute('SELECT epoch FROM epoch WHERE id = 0').fetchone()[0]
+
+    def connection(self):
+        con = getattr(self.local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.file_name, timeout = 60, isolation_level = None)
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute('PRAGMA synchronous=NORMAL')
+            self.local.con = con
+        return con
+
+    @contextlib.contextmanager
+    def transaction(self):
+        con = self.connection()
+        con.execute('BEGIN IMMEDIATE')
+        try:
+            yield con
+        except:
+            con.execute('ROLLBACK')
+            raise
+        con.execute('COMMIT')
+
+    def create_workspace(self, ws_id, max_workspaces):
+        now = time.time()
+        row = self.connection().execute('SELECT last_access FROM workspaces WHERE ws=?', (ws_id,)).fetchone()
+        if (row is not None) and (now - row[0] < 10): return False # access registered recently
+        with self.transaction() as con:
+            created = con.execute('SELECT 1 FROM workspaces WHERE ws=?', (ws_id,)).fetchone() is None
+            if created and (con.execute('SELECT COUNT(*) FROM workspaces').fetchone()[0] >= max_workspaces):
+                raise ValueError('max number of workspaces reached')
+            con.execute('INSERT OR REPLACE INTO workspaces VALUES (?, ?)', (ws_id, now))
+        return created
+
+    def delete_workspace(self, ws_id):
+        with self.transaction() as con:
+            con.execute('DELETE FROM workspaces WHERE ws=?', (ws_id,))
+            con.execute('DELETE FROM data WHERE ws=?', (ws_id,))
+        with self.lock:
+            self.locks.pop(ws_id, None) # lock file kept (may be locked by other processes)
+
+    def workspaces(self):
+        con = self.connection()
+        out = {k: {'last_access': t, 'keys': 0} for k, t in con.execute('SELECT ws, last_access FROM workspaces')}
+        for k, n in con.execute("SELECT ws, COUNT(*) FROM data WHERE key NOT LIKE '\\_%' ESCAPE '\\' AND key NOT LIKE '%:%' GROUP BY ws"):
+            if k in out: out[k]['keys'] = n
+        return out
+
+    def workspace_lock(self, ws_id):
+        with self.lock:
+            if not ws_id in self.locks:
+                self.locks[ws_id] = WorkspaceLock(os.path.join(self.lock_dir, ws_id+'.lock'))
+            return self.locks[ws_id]
+
+    def get(self, ws_id, key):
+        row = self.connection().execute('SELECT value, format, version FROM data WHERE ws=? AND key=?', (ws_id, key)).fetchone()
+        if row is None: return None, 0, False
+        value, lazy = decode_value(row[0], row[1])
+        return value, row[2], lazy
+
+    def version(self, ws_id, key):
+        row = self.connection().execute('SELECT version FROM data WHERE ws=? AND key=?', (ws_id, key)).fetchone()
+        return 0 if row is None else row[0]
+
+    def put(self, ws_id, key, value, lazy = False):
+        value, format = encode_value(value, lazy)
+        with self.transaction() as con:
+            con.execute('UPDATE counter SET version = version + 1 WHERE id = 0')
+            version = con.execute('SELECT version FROM counter WHERE id = 0').fetchone()[0]
+            con.execute('INSERT OR REPLACE INTO data VALUES (?, ?, ?, ?, ?)', (ws_id, key, value, format, version))
+        return version
+
+    def keys(self, ws_id):
+        return [r[0] for r in self.connection().execute('SELECT key FROM data WHERE ws=? ORDER BY version', (ws_id,))]
+
+    def delete(self, ws_id, key):
+        with self.transaction() as con:
+            con.execute('DELETE FROM data WHERE ws=? AND key=?', (ws_id, key))
+
+    def clear(self, ws_id):
+        with self.transaction() as con:
+            con.execute("DELETE FROM data WHERE ws=? AND key NOT LIKE '\\_%' ESCAPE '\\'", (ws_id,))
+
+    def put_job(self, job_id, record, input = None):
+        record = dict(record)
+        result = pickle.dumps(record.pop('result', None))
+        input  = None if input is None else pickle.dumps(input)
+        with self.transaction() as con:
+            con.execute('INSERT OR REPLACE INTO jobs (id, workspace, status, submitted, record, result, input) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (job_id, record['workspace'], record['status'], record['submitted'], pickle.dumps(record), result, input))
+
+    def get_job_input(self, job_id):
+        row = self.connection().execute('SELECT input FROM jobs WHERE id=?', (job_id,)).fetchone()
+        return None if (row is None) or (row[0] is None) else pickle.loads(row[0])
+
+    def drop_job_input(self, job_id):
+        with self.transaction() as con:
+            con.execute('UPDATE jobs SET input=NULL WHERE id=?', (job_id,))
+
+    def get_job(self, job_id, with_result = False):
+        row = self.connection().execute('SELECT record'+(', result' if with_result else '')+' FROM jobs WHERE id=?', (job_id,)).fetchone()
+        if row is None: return None
+        record = pickle.loads(row[0])
+        if with_result: record['result'] = pickle.loads(row[1])
+        return record
+
+    def update_job(self, job_id, func):
+        with self.transaction() as con:
+            record = pickle.loads(con.execute('SELECT record FROM jobs WHERE id=?', (job_id,)).fetchone()[0])
+            changed = func(record)
+            if changed:
+                if 'result' in record:
+                    con.execute('UPDATE jobs SET result=? WHERE id=?', (pickle.dumps(record.pop('result')), job_id))
+                con.execute('UPDATE jobs SET status=?, record=? WHERE id=?', (record['status'], pickle.dumps(record), job_id))
+        return changed, record
+
+    def job_list(self):
+        return [tuple(r) for r in self.connection().execute('SELECT id, workspace, status FROM jobs ORDER BY submitted')]
+
+    def delete_job(self, job_id):
+        with self.transaction() as con:
+            con.execute('DELETE FROM jobs WHERE id=?', (job_id,))
+
+def get_backend():
+    """ recorder backend (created on first use as given in parameters) """
+    global backend
+    with backend_lock:
+        if backend is None:
+            if parameters['recorder_backend'] == 'sqlite':
+                backend = SQLiteBackend(parameters['recorder_file'])
+            elif parameters['recorder_backend'] == 'files':
+                backend = FileBackend(parameters['recorder_dir'])
+            elif parameters['recorder_backend'] == 'memory':
+                backend = MemoryBackend()
+            else:
+                raise ValueError('unknown recorder backend '+str(parameters['recorder_backend']))
+            logging.info('recorder backend: '+parameters['recorder_backend'])
+        return backend
+
+def set_recorder_backend(name, path = None):
+    """ switch recorder backend ('memory', 'files' or 'sqlite'). path: directory or file of backend
+        Local caches are dropped """
+    global backend
+    parameters['recorder_backend'] = name
+    if path is not None:
+        parameters['recorder_dir' if name == 'files' else 'recorder_file'] = path
+    with backend_lock:
+        backend = None
+    with workspaces_lock:
+        workspaces.clear()
+    if has_request_context(): g.pop('workspace', None)
+    get_backend()
+    current_workspace()
+
+def new_workspace(ws_id):
+    """ local caches of a workspace """
+    return {'id': ws_id, 'objects': dict(), 'jsons': dict(), 'digests': dict(),
+            'lock': get_backend().workspace_lock(ws_id)}
+
+def workspace_id():
+    """ id of workspace for current request (default if not given or outside request) """
+    if has_request_context():
+        return request.headers.get('X-Workspace', 'default')
+    return 'default'
+
+def current_workspace():
+    """ get workspace for current request. Create new workspace (incl. standard data) if needed """
+    if has_request_context() and ('workspace' in g): return g.workspace
+    ws_id = workspace_id()
+    evict_workspaces()
+    created = get_backend().create_workspace(ws_id, parameters['max_workspaces'])
+    with workspaces_lock:
+        if created or not ws_id in workspaces:
+            workspaces[ws_id] = new_workspace(ws_id)
+        ws = workspaces[ws_id]
+    if has_request_context(): g.workspace = ws
+    if created:
+        logging.info('created workspace '+ws_id)
+        with ws['lock']:
+            load_std_data()
+    return ws
+
+def evict_workspaces():
+    """ delete workspaces idle for more than parameters['workspace_idle_time'] (seconds) 
+        (checking at most once per minute) """
+    global last_eviction
+    now = time.time()
+    with workspaces_lock:
+        if now - last_eviction < 60: return
+        last_eviction = now
+    b = get_backend()
+    existing = b.workspaces()
+    for k in list(existing):
+        if (k != 'default') and (now - existing[k]['last_access'] > parameters['workspace_idle_time']):
+            lock = b.workspace_lock(k)
+            if lock.acquire(blocking = False): # not in use
+                try:
+                    b.delete_workspace(k)
+                    del existing[k]
+                    logging.info('evicted idle workspace '+k)
+                finally:
+                    lock.release()
+    with workspaces_lock:
+        for k in [k for k in workspaces if not k in existing]: del workspaces[k]
+
+def recorder(key=None, in_data= None, reset:bool = False, obj = None, as_obj:bool = False, parse:bool = True):
+    """ record data (in workspace of current request)
 
     Args:
         key (str, optional): key of the data, If None: retrieve keys
-        in_data (any, optional): data to be stored. If None: retrieve data
+        in_data (any, optional): data to be stored. If None (and no obj given): retrieve data
+        reset (bool, optional): delete all data. Defaults to False
+        obj (any, optional): object already deserialized from in_data (saves parsing when storing)
+                             if given without in_data, JSON is only created when retrieved
+        as_obj (bool, optional): retrieve deserialized object instead of JSON. Defaults to False
+        parse (bool, optional): deserialize in_data when storing (else on first retrieval as object)
 
         keys
         * portf
@@ -47,37 +673,239 @@ def recorder(key=None, in_data= None, reset:bool = False):
         * std_nodes
         * std_assets
     """
-    global data
+    ws = current_workspace()
+    b, ws_id = get_backend(), ws['id']
 
     if reset:
-        data = dict()
+        b.clear(ws_id)
         return 'ok'
 
     if key is None:
-        return list(data)
-    
-    if not in_data is None:  # store
-        data[key] = in_data
+        keys = [k for k in b.keys(ws_id) if not (k.startswith('_') or k.startswith(asset_key('')))]
+        if 'portf' in keys: keys += list(portf_derived_keys)
+        return keys
+
+    if (not in_data is None) or (not obj is None):  # store
+        if (obj is None) and parse:
+            if isinstance(in_data, str):
+                try:
+                    obj = eao.serialization.load_from_json(in_data)
+                except:
+                    obj = None
+            else:
+                obj = in_data
         if key == 'portf':
-            obj = eao.serialization.load_from_json(in_data)
             if not isinstance(obj, eao.portfolio.Portfolio):
                 logging.error('error. no portfolio')
                 raise ValueError('error. no validportfolio passed')
-            data['portf_assets']      = eao.serialization.to_json(obj.assets)
-            data['portf_asset_names'] = obj.asset_names
-            data['portf_nodes']       = eao.serialization.to_json(obj.nodes)
+            # JSON per asset taken from given JSON (no serialization), else created on demand
+            if isinstance(in_data, str): asset_jsons = [json.dumps(a, indent = 4) for a in json.loads(in_data)['assets']]
+            else:                        asset_jsons = [None]*len(obj.assets)
+            old_names = recorder('portf_asset_names') or []
+            for a, a_json in zip(obj.assets, asset_jsons):
+                store_key(ws, asset_key(a.name), a_json, a)
+            for n in old_names:
+                if not n in obj.asset_names: delete_key(ws, asset_key(n))
+            store_key(ws, 'portf', list(obj.asset_names), obj)
+        else:
+            store_key(ws, key, in_data, obj)
         return 'ok'
     else: # get
-        if key in data:
-            return data[key]
-        else:
+        if (key == 'portf') or (key in portf_derived_keys):
+            return get_portf(ws, key, as_obj)
+        version = b.version(ws_id, key)
+        if version == 0:
             logging.info('recorder. tried to retrieve  '+key+'  not existent')
             return None
+        cache = ws['objects'] if as_obj else ws['jsons']
+        if (key in cache) and (cache[key][0] == version):
+            return cache[key][1]
+        value, version, lazy = b.get(ws_id, key)
+        if as_obj:
+            if isinstance(value, str) and not lazy: out = eao.serialization.load_from_json(value)
+            else:                                   out = value
+        else:
+            if lazy: out = eao.serialization.to_json(value) # stored as object only
+            else:    out = value
+        cache[key] = (version, out)
+        return out
+
+def store_key(ws, key, in_data, obj):
+    """ store data in backend, invalidate and fill local caches (use recorder) """
+    for cache in ('objects', 'jsons', 'digests'): ws[cache].pop(key, None) # invalidate
+    if in_data is None: version = get_backend().put(ws['id'], key, obj, lazy = True)
+    else:               version = get_backend().put(ws['id'], key, in_data)
+    if obj is not None: ws['objects'][key] = (version, obj)
+
+def delete_key(ws, key):
+    """ delete data from backend and local caches (use recorder) """
+    for cache in ('objects', 'jsons', 'digests'): ws[cache].pop(key, None)
+    get_backend().delete(ws['id'], key)
+
+# the portfolio is stored per asset, so that an edit only touches the changed asset:
+#  * portf_asset:<asset name>  JSON and object of each asset
+#  * portf                     list of asset names (order of portfolio), new version with every change
+# JSON and object of the full portfolio and the derived keys portf_assets, portf_asset_names and
+# portf_nodes are assembled on retrieval (cached with the version of portf)
+portf_derived_keys = ('portf_assets', 'portf_asset_names', 'portf_nodes')
+
+def asset_key(name):
+    """ recorder key of asset in stored portfolio """
+    return 'portf_asset:'+name
+
+def get_portf(ws, key, as_obj):
+    """ retrieve portfolio or derived key (use recorder) """
+    b = get_backend()
+    names, version, _ = b.get(ws['id'], 'portf')
+    if version == 0:
+        logging.info('recorder. tried to retrieve  '+key+'  not existent')
+        return None
+    cache = ws['objects'] if as_obj else ws['jsons']
+    if (key in cache) and (cache[key][0] == version):
+        return cache[key][1]
+    if key == 'portf_asset_names':
+        out = list(names)
+    elif as_obj and (key == 'portf'):
+        out = eao.portfolio.Portfolio([recorder(asset_key(n), as_obj = True) for n in names])
+    elif as_obj:
+        portf = get_portf(ws, 'portf', True)
+        out = portf.assets if key == 'portf_assets' else portf.nodes
+    elif key == 'portf_nodes':
+        out = eao.serialization.to_json(get_portf(ws, 'portf', True).nodes)
+    else: # concatenate JSON of assets
+        assets = '['+', '.join([recorder(asset_key(n)) for n in names])+']'
+        if key == 'portf_assets': out = assets
+        else:                     out = '{"__class__": "Portfolio", "assets": '+assets+'}'
+    cache[key] = (version, out)
+    return out
+
+def set_portf_assets(changes:dict):
+    """ change assets of stored portfolio. Only changed assets are stored (serialized on demand)
+        Args:
+            changes (dict): asset name -> new asset (None: delete asset). Unknown names are added,
+                            a renamed asset keeps its place
+    """
+    names  = list(recorder('portf_asset_names') or [])
+    assets = {}
+    for name, a in changes.items():
+        if a is None:
+            names.remove(name)
+            assets.pop(name, None)
+            continue
+        if (a.name != name) and (a.name in names):
+            raise ValueError('Asset names in portfolio must be unique')
+        if name in names: names[names.index(name)] = a.name
+        else:             names.append(a.name)
+        assets.pop(name, None)
+        assets[a.name] = a
+    store_portf_assets(names, assets)
+
+def store_portf_assets(names:list, assets:dict):
+    """ store portfolio as list of asset names and changed assets (name -> asset). Stored assets 
+        not in names are deleted """
+    ws = current_workspace()
+    for n in recorder('portf_asset_names') or []:
+        if not n in names: delete_key(ws, asset_key(n))
+    for n, a in assets.items():
+        store_key(ws, asset_key(n), None, a)
+    store_key(ws, 'portf', list(names), None)
+
+def data_version(key):
+    """ version of stored data (new version with every write). 0 if never stored """
+    if key in portf_derived_keys: key = 'portf'
+    return get_backend().version(current_workspace()['id'], key)
+
+def data_digest(key):
+    """ hash of stored data (content address). None if not stored """
+    ws = current_workspace()
+    b = get_backend()
+    version = data_version(key)
+    if version == 0: return None
+    if (key in ws['digests']) and (ws['digests'][key][0] == version):
+        return ws['digests'][key][1]
+    value, _, lazy = b.get(ws['id'], key)
+    if lazy and is_array_dict(value):
+        # stored as arrays only (binary upload) - avoid creating JSON
+        h = hashlib.sha256()
+        for k in value:
+            h.update(str(k).encode())
+            h.update(np.ascontiguousarray(value[k]).tobytes())
+        digest = h.hexdigest()
+    else:
+        d = recorder(key)
+        if not isinstance(d, str): d = json.dumps(d)
+        digest = hashlib.sha256(d.encode()).hexdigest()
+    ws['digests'][key] = (version, digest)
+    return digest
         
 
 #  launch server ###############################################
 app = Flask(__name__)
 
+############## workspaces
+class WorkspacePrefix:
+    """ WSGI middleware: route /ws/<workspace id>/<route> to /<route> with header X-Workspace """
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith('/ws/'):
+            parts = path.split('/', 3)
+            environ['HTTP_X_WORKSPACE'] = parts[2]
+            environ['PATH_INFO'] = '/' + (parts[3] if len(parts) > 3 else '')
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = WorkspacePrefix(app.wsgi_app)
+
+# endpoints not using the workspace (no need to wait for lock)
+lock_free_endpoints = ('index', 'say_hello', 'job_status', 'get_jobs', 'job_result', 'job_cancel',
+                       'get_result_cache_info', 'flush_result_cache', 'get_workspaces', 'get_startup_timing', 'ready', 'reload_std_data', 'get_schema', 'job_progress', 'static')
+
+@app.before_request
+def enter_workspace():
+    """ check workspace id and lock workspace for request """
+    ws_id = workspace_id()
+    if not re.fullmatch(r'[A-Za-z0-9_\-]{1,64}', ws_id):
+        s = 'no valid workspace id: '+ws_id
+        logging.error(s)
+        return s, 400
+    if request.endpoint in lock_free_endpoints: return
+    try:
+        ws = current_workspace()
+    except ValueError as e:
+        s = str(e)
+        logging.error(s)
+        return s, 503
+    ws['lock'].acquire()
+    g.locked_workspace = ws
+
+@app.teardown_request
+def leave_workspace(exc = None):
+    release_workspace()
+
+def release_workspace():
+    """ release lock on workspace of current request (e.g. before long calculations with inputs taken) """
+    ws = g.pop('locked_workspace', None)
+    if ws is not None: ws['lock'].release()
+
+@app.route('/get_workspaces', methods=['GET'])
+def get_workspaces():
+    """ get list of workspaces with last access (seconds since epoch) """
+    return get_backend().workspaces(), 200
+
+@app.route('/delete_workspace', methods=['GET'])
+def delete_workspace():
+    """ delete workspace of current request (default workspace is reset) """
+    ws_id = workspace_id()
+    if ws_id == 'default':
+        return reset()
+    get_backend().delete_workspace(ws_id)
+    with workspaces_lock:
+        workspaces.pop(ws_id, None)
+    s = 'deleted workspace '+ws_id
+    logging.info(s)
+    return s, 200
+
 @app.route('/')
 def index():
   return 'EAO online!'
@@ -87,22 +915,191 @@ def say_hello():
     # much more missing
     return 'Please refer to https://energyassetoptimization.github.io/EAO/'
 
+@app.route('/get_startup_timing', methods=['GET'])
+def get_startup_timing():
+    """ startup timing report (seconds): module import, std data, deferred package imports """
+    out = dict(startup_timing)
+    out['lazy_init'] = parameters['lazy_init']
+    return out, 200
+
 @app.route('/reset')
 def reset():
-    global parameters
-    """ Resetting all temporarily stored data"""
+    """ Resetting all temporarily stored data (of workspace)"""
     logging.info('resetting all temp data')
     recorder(reset= True)
-    #  load standard data ##########################################        
-    logging.info('loading std data')
-    recorder(key='std_nodes', in_data= eao.serialization.to_json(eao.serialization.load_from_json(file_name=parameters['file_nodes'])))
-    recorder(key='std_assets', in_data= eao.serialization.to_json(eao.serialization.load_from_json(file_name=parameters['file_assets'])))
+    load_std_data()
     return 'done reset', 200
 
+# pristine std data: files are parsed once per process. The snapshot is restored by reference
+# on reset and for new workspaces -- objects are shared and must not be manipulated (as all
+# cached objects). /reload_std_data reads the files again if changed on disk (mtime)
+std_snapshot = None
+std_snapshot_lock = threading.Lock()
+
+def get_std_snapshot(reload:bool = False):
+    """ snapshot of std data {'data': {key: (JSON, object or None)}, 'files', 'mtimes', 'loaded'}
+        built on first use. reload: build again if files or their mtimes changed """
+    global std_snapshot
+    with std_snapshot_lock:
+        files  = {'std_nodes': parameters['file_nodes'], 'std_assets': parameters['file_assets']}
+        mtimes = {k: os.path.getmtime(files[k]) for k in files}
+        if (std_snapshot is None) or (reload and ((std_snapshot['files'] != files) or (std_snapshot['mtimes'] != mtimes))):
+            logging.info('loading std data')
+            t0 = time.perf_counter()
+            data = {}
+            for key in files:
+                if parameters['lazy_init']:
+                    # files are written by eao serialization (capture_standards.py) -- use as is
+                    with open(files[key], 'r', encoding = 'utf-8') as f:
+                        data[key] = (f.read(), None)
+                else:
+                    obj = eao.serialization.load_from_json(file_name = files[key])
+                    data[key] = (eao.serialization.to_json(obj), obj)
+            std_snapshot = {'data': data, 'files': files, 'mtimes': mtimes, 'loaded': time.time()}
+            startup_timing.setdefault('std data', time.perf_counter() - t0)
+        return std_snapshot
+
+def load_std_data():
+    """ load standard data (nodes, assets) from snapshot """
+    for key, (json_data, obj) in get_std_snapshot()['data'].items():
+        recorder(key = key, in_data = json_data, obj = obj, parse = False)
+
+@app.route('/reload_std_data', methods=['GET'])
+def reload_std_data():
+    """ admin: read std data files again if changed on disk. Used by /reset and new workspaces
+        returns 
+           changed (bool), files and their mtimes """
+    try:
+        before = get_std_snapshot()
+        snap   = get_std_snapshot(reload = True)
+    except Exception as e:
+        s = 'could not reload std data: '+str(e)
+        logging.error(s)
+        return s, 400
+    logging.info('reload std data, changed: '+str(snap is not before))
+    return {'changed': snap is not before, 'files': snap['files'], 'mtimes': snap['mtimes']}, 200
+
+############## ETags
+# read endpoints send an ETag built from the versions of the recorder keys they depend on.
+# Requests with matching If-None-Match are answered with 304 (not modified), without building the response
+
+def data_etag(*keys):
+    """ ETag for current request from versions of recorder keys (and epoch of backend) """
+    tag = get_backend().epoch+'|'+workspace_id()+'|'+request.full_path+'|'+'|'.join(k+':'+str(data_version(k)) for k in keys)
+    return hashlib.sha1(tag.encode()).hexdigest()
+
+def etag_response(etag, build):
+    """ 304 if client has current version (If-None-Match), else response of build() with ETag """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status = 304)
+    else:
+        response = app.make_response(build())
+        if response.status_code != 200: return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache' # always revalidate
+    return response
+
+############## compression and streaming
+# large JSON responses (get_data, results) are sent as stream of chunks, built piece by piece
+# (no full copy of the body in memory). Responses are compressed according to Accept-Encoding
+# (zstd, gzip) -- streamed responses chunk by chunk
+compressible_mimetypes = ('application/json', 'text/html', 'text/plain', 'text/csv')
+zstd_available = importlib.util.find_spec('zstandard') is not None # optional, imported when used
+
+def stream_json(obj):
+    """ JSON of obj as generator of bytes. Strings and dicts are split (no full JSON string) """
+    chunk_size = parameters['stream_chunk_size']
+    if isinstance(obj, str):
+        yield b'"'
+        for i in range(0, len(obj), chunk_size):
+            yield json.dumps(obj[i:i+chunk_size])[1:-1].encode()
+        yield b'"'
+    elif isinstance(obj, dict):
+        yield b'{'
+        for i, k in enumerate(obj):
+            yield ((', ' if i > 0 else '')+json.dumps(str(k))+': ').encode()
+            yield from stream_json(obj[k])
+        yield b'}'
+    else:
+        yield json.dumps(obj).encode()
+
+def buffered(chunks):
+    """ join small chunks to chunks of about parameters['stream_chunk_size'] """
+    buffer, n = [], 0
+    for c in chunks:
+        buffer.append(c)
+        n += len(c)
+        if n >= parameters['stream_chunk_size']:
+            yield b''.join(buffer)
+            buffer, n = [], 0
+    if n > 0: yield b''.join(buffer)
+
+def raw_json(data):
+    """ stored JSON string as generator of bytes (no encoding). Other values are JSON encoded """
+    if not isinstance(data, str):
+        yield from stream_json(data)
+        return
+    chunk_size = parameters['stream_chunk_size']
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i+chunk_size].encode()
+
+def raw_response(data):
+    """ response with stored JSON string passed through unchanged, streamed if large """
+    if isinstance(data, str) and (len(data) < parameters['stream_min_size']):
+        return Response(data, mimetype = 'application/json')
+    return Response(buffered(raw_json(data)), mimetype = 'application/json')
+
+def json_response(obj, size = None, mimetype = 'application/json'):
+    """ response with JSON of obj, streamed if (estimated) size is large """
+    if (size is not None) and (size >= parameters['stream_min_size']):
+        return Response(buffered(stream_json(obj)), mimetype = mimetype)
+    return Response(json.dumps(obj), mimetype = mimetype)
+
+def compressor(encoding):
+    """ object with compress(bytes) and flush() for content encoding """
+    if encoding == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level = 3).compressobj()
+    return zlib.compressobj(6, zlib.DEFLATED, 31) # gzip
+
+def compressed(chunks, encoding):
+    c = compressor(encoding)
+    for chunk in chunks:
+        if isinstance(chunk, str): chunk = chunk.encode()
+        out = c.compress(chunk)
+        if out: yield out
+    yield c.flush()
+
+def accepted_encoding():
+    """ content encoding for response (None: no compression) """
+    encodings = ['zstd', 'gzip'] if zstd_available else ['gzip']
+    return request.accept_encodings.best_match(encodings)
+
+@app.after_request
+def compress_response(response):
+    """ compress response according to Accept-Encoding """
+    if (response.status_code != 200) or ('Content-Encoding' in response.headers) or (response.mimetype not in compressible_mimetypes):
+        return response
+    if (not response.is_streamed) and ((response.content_length or 0) < parameters['compress_min_size']):
+        return response
+    encoding = accepted_encoding()
+    if encoding is None: return response
+    response.vary.add('Accept-Encoding')
+    if response.is_streamed:
+        response.response = compressed(response.response, encoding)
+    else:
+        response.set_data(b''.join(compressed([response.get_data()], encoding)))
+    response.headers['Content-Encoding'] = encoding
+    if response.is_streamed: response.headers.pop('Content-Length', None)
+    etag, weak = response.get_etag()
+    if (etag is not None) and not weak: response.set_etag(etag, weak = True) # other representation
+    return response
+
 @app.route('/get_data_keys', methods=['GET'])
 def send_data_keys():
     """ get keys of stored data """
-    return json.dumps(recorder())
+    s = json.dumps(recorder())
+    return etag_response(hashlib.sha1((get_backend().epoch+'|'+workspace_id()+'|'+s).encode()).hexdigest(), lambda: s)
 
 @app.route('/set_solver', methods=['PUT'])
 def set_solver():
@@ -112,18 +1109,23 @@ def set_solver():
         logging.error(s)
         return s, 400
     if not data in ('standard', 'STANDARD', 'CBC', 'CLARABEL', 
-                    'GUROBI', 'CPLEX', 'ECOS', 'GLPK', 'GLPK_MI', 'SCIP', 'SCIPY', 
+                    'GUROBI', 'CPLEX', 'ECOS', 'GLPK', 'GLPK_MI', 'HIGHS', 'SCIP', 'SCIPY', 
                     'XPPRESS', 'SDPA', 'OSQP', 'COPT', 'MOSEK', 'NAG'):
         s = data+' - is no valid solver'
         logging.error(s)
         return s, 400
-    global parameters
+    # solver is chosen per workspace (default: parameters['solver'])
     if data.lower != 'standard': 
-        parameters['solver'] = data
+        recorder('_solver', data, obj = data)
     else:
-        parameters['solver'] = 'standard'
+        recorder('_solver', 'standard', obj = 'standard')
     return 'set solver to '+str(data), 200
 
+def get_solver():
+    """ solver chosen for workspace of current request """
+    if data_version('_solver') == 0: return parameters.get('solver', 'standard')
+    return recorder('_solver')
+
 
 @app.route('/set_portf', methods=['PUT'])
 def receive_portf():
@@ -134,7 +1136,7 @@ def receive_portf():
         try:
             portf = eao.serialization.load_from_json(data)
             if not isinstance(portf, eao.portfolio.Portfolio): raise ValueError('no portfolio')
-            recorder('portf', data)
+            recorder('portf', data, obj = portf)
         except:
             s = "no valid portfolio json"
             logging.error(s)
@@ -160,14 +1162,13 @@ def add_std_node():
             obj = eao.serialization.load_from_json(data)
             if not isinstance(obj, eao.basic_classes.Node): raise ValueError('no valid node given')
             # get std_nodes
-            nodes = recorder('std_nodes')
-            nodes = eao.serialization.load_from_json(nodes)
+            nodes = recorder('std_nodes', as_obj = True)
             # go through - delete old node with same name and add
             my_name = obj.name
             new_nodes = [obj]
             for n in nodes:
                 if n.name != my_name: new_nodes.append(n)
-            recorder('std_nodes', eao.serialization.to_json(new_nodes))
+            recorder('std_nodes', eao.serialization.to_json(new_nodes), obj = new_nodes)
         except:
             s = "no valid node json"
             logging.error(s)
@@ -188,8 +1189,7 @@ def add_std_node():
 def del_std_node():
     """ delete node from list of std_nodes and store in recorder """
     key = request.get_json()
-    nodes = recorder('std_nodes')
-    nodes = eao.serialization.load_from_json(nodes)
+    nodes = recorder('std_nodes', as_obj = True)
     deleted = False
     new_nodes = []
     for a in nodes:
@@ -200,7 +1200,7 @@ def del_std_node():
             new_nodes.append(a)
     if deleted:
         logging.info('deleted node '+key)
-        recorder(key = 'std_nodes', in_data = eao.serialization.to_json(new_nodes))
+        recorder(key = 'std_nodes', in_data = eao.serialization.to_json(new_nodes), obj = new_nodes)
         return 'done', 200
     else:
         s = 'node not found for deletion: '+key
@@ -216,7 +1216,7 @@ def receive_timegrid():
         try:
             obj = eao.serialization.load_from_json(data)
             if not isinstance(obj, eao.basic_classes.Timegrid): raise ValueError('no valid timegrid')
-            recorder('timegrid', data)
+            recorder('timegrid', data, obj = obj)
         except:
             s = "no valid timegrid json"
             logging.error(s)
@@ -232,125 +1232,1321 @@ def receive_timegrid():
        logging.error(s)
        return s, 400
 
-@app.route('/set_time_series_data', methods=['PUT'])
-def receive_input_ts_data():
-    """ setup problem (3) send price and other data to eao server """    
-    data = request.get_json()
+def parse_ts_data(data):
+    """ translate time series data as passed by client to dict of arrays
+
+    Args:
+        data (str or dict): eao JSON (of eao.Timeseries type) or dict of lists of values
+
+    Returns:
+        dict: time series data (no JSON created, see receive_input_ts_data)
+    """
     if isinstance(data, str):    ## if json is given should be of eao.Timeseries type
         try:
-            # try to translate to time series
-            try:
-                obj = eao.serialization.load_from_json(data)
-                recorder('time_series_data', data)
-            except:
-                s = "no valid time series json"
-                logging.error(s)
-                return s, 400
-            logging.info('received time series data')
-            return "Done", 200       
+            return eao.serialization.load_from_json(data)
         except:
-            s = 'error, could not parse data'
-            logging.error(s)
-            return s, 400
+            raise ValueError("no valid time series json")
     elif isinstance(data, dict): # likely given as dict of list of values
+        obj = {}
         for k in data:
             try:
-                data[k] = np.asarray(data[k])
+                obj[k] = np.asarray(data[k])
             except:
-                s = "no valid time series data (dict of lists)"
-                logging.error(s)
-                return s, 400
-        s = eao.serialization.to_json(data)
-        recorder('time_series_data', s)
-        logging.info('received time series data')
-        return "Done", 200       
+                raise ValueError("no valid time series data (dict of lists)")
+        return obj
+    else:
+        raise ValueError('passed unknown type to set_time_series_data')
+
+def parse_ts_binary(body, mimetype, names = None):
+    """ translate time series data passed as binary to dict of arrays (no JSON involved)
+
+    Args:
+        body (bytes): request body
+        mimetype (str): format of body
+          * application/x-npz: numpy .npz file (np.savez) -- array names are series names
+          * application/x-npy: numpy .npy file. 1d array (one name) or 2d array (one row per name)
+          * application/vnd.apache.arrow.stream / .file: Arrow IPC, one column per series (requires pyarrow)
+          * application/octet-stream: raw float64 (little endian), one series after the other (equal length)
+                preceded by a header: uint32 (little endian) length n of the header + n bytes
+                JSON list of series names (utf-8)
+        names (list, optional): series names for npy
+
+    Returns:
+        dict: time series data
+    """
+    out = {}
+    if mimetype == 'application/x-npz':
+        with np.load(io.BytesIO(body), allow_pickle = False) as f:
+            for k in f.files: out[k] = f[k]
+    elif mimetype == 'application/x-npy':
+        arr = np.load(io.BytesIO(body), allow_pickle = False)
+        if names is None: raise ValueError('names of series required for npy')
+        if arr.ndim == 1: arr = arr.reshape(1, -1)
+        if arr.ndim != 2 or arr.shape[0] != len(names): raise ValueError('npy: need one row per series name')
+        for i, k in enumerate(names): out[k] = arr[i]
+    elif mimetype in ('application/vnd.apache.arrow.stream', 'application/vnd.apache.arrow.file'):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError('Arrow format not supported - pyarrow not installed')
+        if mimetype.endswith('stream'): table = pa.ipc.open_stream(body).read_all()
+        else:                           table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+        for k in table.column_names:
+            out[k] = table.column(k).to_numpy()
+    elif mimetype == 'application/octet-stream':
+        if len(body) < 4: raise ValueError('no valid binary time series data')
+        n = int(np.frombuffer(body, dtype='<u4', count = 1)[0])
+        names = json.loads(body[4:4+n].decode('utf-8'))
+        values = np.frombuffer(body, dtype = '<f8', offset = 4+n)
+        if (not isinstance(names, list)) or (len(names) == 0) or (len(values) % len(names) != 0):
+            raise ValueError('binary time series data: length does not match number of series')
+        values = values.reshape(len(names), -1)
+        for i, k in enumerate(names): out[k] = values[i]
     else:
-        s = 'passed unknown type to set_time_series_data'
+        raise ValueError('unknown format for time series data: '+str(mimetype))
+    for k in out: # aligned and writeable data (copy only if needed, e.g. views on request body)
+        out[k] = np.asarray(out[k], dtype = float)
+        if not (out[k].flags.writeable and out[k].flags.aligned): out[k] = out[k].copy()
+    return out
+
+@app.route('/set_time_series_data', methods=['PUT'])
+def receive_input_ts_data():
+    """ setup problem (3) send price and other data to eao server
+        as JSON (eao JSON or dict of lists) or binary (see parse_ts_binary). 
+        Binary data is stored without JSON conversion """    
+    try:
+        if request.is_json:
+            data = request.get_json()
+            obj  = parse_ts_data(data)
+            s    = data if isinstance(data, str) else eao.serialization.to_json(obj)
+        else:
+            names = request.args.get('names')
+            if names is not None: names = names.split(',')
+            obj, s = parse_ts_binary(request.get_data(), request.mimetype, names = names), None
+    except ValueError as e:
+        s = str(e)
+        logging.error(s)
+        return s, 400
+    except:
+        s = 'error, could not parse data'
         logging.error(s)
-        return s, 400        
+        return s, 400
+    recorder('time_series_data', s, obj = obj)
+    logging.info('received time series data')
+    return "Done", 200       
     
-@app.route('/get_data', methods=['PUT'])
-def send_data():
-    """ retrieve specified data from server to client """
+def patch_ts(ts_data, patch):
+    """ apply patch to time series data (arrays changed in place where possible)
+
+    Args:
+        ts_data (dict): time series data to patch
+        patch (dict): 
+           name   (str): name of series (new series if not existent)
+           values (list): values
+           t0 (int, optional): start of slice [t0, t1) to replace (index). Defaults to None: replace whole series
+           t1 (int, optional): end of slice. Defaults to t0 + number of values. Beyond end: series is extended
+           append (bool, optional): append values to series (t0 = end of series). Defaults to False
+    """
+    if not isinstance(patch, dict) or not 'name' in patch or not 'values' in patch:
+        raise ValueError('patch must be dict with name and values')
+    name   = patch['name']
+    values = np.asarray(patch['values'], dtype = float)
+    if values.ndim != 1: raise ValueError('values must be list of numbers -- series '+str(name))
+    t0 = patch.get('t0', None)
+    if patch.get('append', False):
+        if not name in ts_data: t0 = 0
+        else:                   t0 = len(ts_data[name])
+    if t0 is None: # replace whole series
+        ts_data[name] = values
+        return
+    if not name in ts_data:
+        if t0 != 0: raise ValueError('new series '+str(name)+' must start at t0 = 0')
+        ts_data[name] = values
+        return
+    if not isinstance(ts_data[name], np.ndarray):
+        raise ValueError('series '+str(name)+' is no array - can only be replaced as a whole')
+    t1 = patch.get('t1', None)
+    if t1 is None: t1 = t0 + len(values)
+    if (t0 < 0) or (t0 > len(ts_data[name])) or (t1 - t0 != len(values)):
+        raise ValueError('invalid slice ['+str(t0)+','+str(t1)+') for series '+str(name))
+    arr = ts_data[name]
+    if arr.dtype != float: arr = arr.astype(float)
+    if t1 > len(arr): # extend
+        arr = np.concatenate((arr[:t0], values))
+    else:
+        arr[t0:t1] = values # in place
+    ts_data[name] = arr
+
+@app.route('/patch_time_series_data', methods=['PATCH', 'PUT'])
+def patch_input_ts_data():
+    """ update stored time series data: replace or append a series or a slice [t0, t1) of it
+        arg
+           dict (or list of dicts) with name, values and optionally t0, t1, append (see patch_ts)
+        returns
+           version of time series data """
+    patches = request.get_json()
+    if isinstance(patches, dict): patches = [patches]
+    if not isinstance(patches, list):
+        s = 'patch must be dict or list of dicts'
+        logging.error(s)
+        return s, 400
+    ts_data = get_obj('time_series_data')
+    if not isinstance(ts_data, dict):
+        ts_data = {}
+    # patched series are copied once (copy on write), so that running optimizations
+    # are not affected and nothing is changed if a patch is invalid
+    new = dict(ts_data)
+    touched = []
     try:
-        s = json.dumps(recorder(request.get_json()))
+        for p in patches:
+            name = p.get('name') if isinstance(p, dict) else None
+            if (not name in touched) and isinstance(new.get(name), np.ndarray):
+                new[name] = new[name].copy()
+            patch_ts(new, p)
+            touched.append(name)
+    except ValueError as e:
+        s = str(e)
+        logging.error(s)
+        return s, 400
     except:
-        try: 
-            k = request.get_json()
-        except: 
-            k = 'error'
-        s = 'error. requested data'+ k + ' could not be retrieved'
+        s = 'error, could not patch time series data'
+        logging.error(s)
         return s, 400
-    return s, 200
+    recorder('time_series_data', obj = new) # cached object is shared -- never changed in place
+    logging.info('patched time series data')
+    return json.dumps(data_version('time_series_data')), 200
+
+@app.route('/get_data', methods=['PUT'])
+def send_data():
+    """ retrieve specified data from server to client
+        ?raw=1: stored JSON sent unchanged (application/json), no further JSON encoding """
+    raw = request.args.get('raw', '0').lower() in ('1', 'true')
+    def send():
+        try:
+            data = recorder(request.get_json())
+            if raw: return raw_response(data)
+            size = len(data) if isinstance(data, str) else None # large JSON strings are streamed
+            return json_response(data, size, mimetype = 'text/html')
+        except:
+            try: 
+                k = request.get_json()
+            except: 
+                k = 'error'
+            s = 'error. requested data'+ k + ' could not be retrieved'
+            return s, 400
+    key = request.get_json(silent = True)
+    if isinstance(key, str) and (data_version(key) > 0):
+        return etag_response(data_etag(key), send)
+    return send()
     
+@app.route('/get_data_multi', methods=['PUT'])
+def send_data_multi():
+    """ retrieve several data sets in one response: list of keys --> {key: stored JSON}
+        stored JSON is passed through unchanged (as with /get_data?raw=1) """
+    keys = request.get_json(silent = True)
+    if (not isinstance(keys, list)) or (not all(isinstance(k, str) for k in keys)):
+        s = 'error. get_data_multi requires list of keys'
+        logging.error(s)
+        return s, 400
+    def send():
+        try:
+            data = {k: recorder(k) for k in keys}
+        except:
+            s = 'error. requested data '+str(keys)+' could not be retrieved'
+            logging.error(s)
+            return s, 400
+        def chunks():
+            yield b'{'
+            for i, k in enumerate(keys):
+                yield ((', ' if i > 0 else '')+json.dumps(k)+': ').encode()
+                yield from raw_json(data[k])
+            yield b'}'
+        return Response(buffered(chunks()), mimetype = 'application/json')
+    return etag_response(data_etag(*keys), send)
+
 @app.route('/optimize', methods=['GET'])
 def optimize():
     global parameters
-    """ (3) GO! """
+    """ (3) GO! 
+        results format by query parameter format or Accept header (see send_results) 
+        rolling horizon mode by query parameters window and overlap (time steps, see solve) 
+        solver time limit (s) and relative MIP gap by query parameters time_limit, mip_gap
+        problems above parameters['max_cost_optimize'] are refused (see /estimate_problem) """
     try:
-        tg      = eao.serialization.load_from_json(recorder('timegrid'))
-        portf   = eao.serialization.load_from_json(recorder('portf'))
-        ts_data = eao.serialization.load_from_json(recorder('time_series_data'))
+        tg      = recorder('timegrid', as_obj = True)
+        portf   = recorder('portf', as_obj = True)
+        ts_data = recorder('time_series_data', as_obj = True)
     except:
         s = 'could not load data for optimization'
         logging.error(s)
         return s, 400
-    # check max time
-    if tg.T > parameters['max_optim_steps']:
-        s = 'max number of time steps for optimization exceeded (computation time limit)'
+    window, overlap, s = get_rolling_args()
+    if s is not None: return s, 400
+    limits, s = get_solver_limits()
+    if s is not None: return s, 400
+    estimate, s = get_estimate(portf, tg, ts_data, window, overlap)
+    if s is not None: return s, 400
+    if estimate['admission'] != 'optimize':
+        s = 'problem too expensive to optimize (estimated cost '+str(estimate['cost'])+')'
+        if estimate['admission'] == 'job': s += ' - submit as background job (/optimize_submit)'
         logging.error(s)
-        return s,400
+        return s, 400
+    solver = get_solver()
+    s = check_solver_limits(limits, solver, estimate)
+    if s is not None: return s, 400
+    cache_key = result_cache_key([data_digest(k) for k in ('portf', 'timegrid', 'time_series_data')], solver, window, overlap, limits)
+    problem_key = (data_version('portf'), data_version('timegrid'))
+    release_workspace() # inputs taken - workspace may be changed meanwhile
+    res = result_cache_get(cache_key)
+    if res is not None:
+        logging.info('optimize. results taken from cache')
+        return send_results(res)
+    res, code = solve(portf, tg, ts_data, solver = solver, window = window, overlap = overlap, 
+                      problem_key = problem_key, limits = limits)
+    if code != 200: return res, code
+    result_cache_put(cache_key, res)
+    return send_results(res)
+
+def solve(portf, tg, ts_data, solver = 'standard', window = None, overlap = 0, problem_key = None, limits = None):
+    """ set up and solve optimization problem, collect results
+
+    Args:
+        portf (Portfolio): portfolio to optimize
+        tg (Timegrid): timegrid
+        ts_data (dict): time series data (prices etc)
+        solver (str, optional): solver. Defaults to 'standard'
+        window (int, optional): rolling horizon -- number of time steps per window. Defaults to None (no rolling horizon)
+        overlap (int, optional): rolling horizon -- time steps at the end of each window that are not committed, 
+                                 but re-optimized in the next window. Defaults to 0
+        problem_key (any, optional): key to reuse set up problem if only prices change (see get_problem). 
+                                     Defaults to None (set up problem from scratch)
+        limits (dict, optional): solver limits time_limit (s), mip_gap (see solver_limits). Defaults to None
+
+    Returns:
+        results (dict: total value, dispatch (DataFrame)) or error message (str), http status code
+    """
+    # own copies -- setting up changes portfolio, assets and timegrid (cached objects are shared)
+    portf, tg = copy.deepcopy((portf, tg))
+    if (window is not None) and (window < tg.T):
+        return solve_rolling(portf, tg, ts_data, solver = solver, window = window, overlap = overlap, limits = limits)
+    op, res, s = setup_and_optimize(portf, tg, ts_data, solver, problem_key = problem_key, limits = limits)
+    if s is not None: return s, 400
+    report_progress('extracting')
     try:
-        op = portf.setup_optim_problem(prices = ts_data, timegrid = tg)
+        out = eao.io.extract_output(portf, op, res)
+        return {'total value': res.value, 'dispatch': out['dispatch']}, 200
     except:
-        s = 'error - could not set up problem'
+        s = 'error - could not extract data'
         logging.error(s)
         return s, 400
+
+def setup_and_optimize(portf, tg, ts_data, solver = 'standard', problem_key = None, limits = None):
+    """ set up and solve optimization problem
+    Returns:
+        optim problem, results, error message (None if successful) """
+    report_progress('setup')
     try:
-        if 'solver' in parameters :
-            if parameters['solver'] !='standard':
-                res = op.optimize(solver = parameters['solver'] )
+        if problem_key is None:
+            op = portf.setup_optim_problem(prices = ts_data, timegrid = tg)
+        else:
+            op = get_problem(portf, tg, ts_data, problem_key)
+    except:
+        s = 'error - could not set up problem'
+        logging.error(s)
+        return None, None, s
+    report_progress('solving')
+    try:
+        with solver_limits(limits):
+            if (solver is not None) and (solver != 'standard'):
+                res = op.optimize(solver = solver)
             else:
                 res = op.optimize()
-        else:
-            res = op.optimize()
     except:
         s = 'error - could not optimize'
         logging.error(s)
+        return op, None, s
+    if isinstance(res, str):
+        logging.error(res)
+        return op, None, res
+    return op, res, None
+
+############## reuse of set up optimization problems
+# the structure of the problem (bounds, restrictions) does not change if only prices 
+# change. Problems set up for stored portfolios and timegrids are kept and only
+# the cost vector is refreshed. Time series used by assets for other parameters than 
+# costs (e.g. capacities) are part of the structure -- if they change, the problem is set up again
+problem_cache = OrderedDict()
+problem_cache_stats = {'built': 0, 'reused': 0}
+problem_cache_lock = threading.Lock()
+# asset parameters that only enter the cost vector
+cost_parameters = ('price', 'extra_costs', 'costs_time_series', 'running_costs')
+
+def structural_ts_keys(obj, ts_data, keys = None):
+    """ names of time series used by assets (incl. nested assets) in other parameters than costs """
+    if keys is None: keys = set()
+    if isinstance(obj, (list, tuple)):
+        for o in obj: structural_ts_keys(o, ts_data, keys)
+    elif isinstance(obj, (eao.portfolio.Portfolio, eao.assets.Asset)):
+        for k, v in vars(obj).items():
+            if isinstance(v, str):
+                if (v in ts_data) and (not k in cost_parameters): keys.add(v)
+            elif isinstance(v, (list, tuple, eao.assets.Asset)):
+                structural_ts_keys(v, ts_data, keys)
+    return keys
+
+def ts_digest(ts_data, keys):
+    """ hash of given time series """
+    h = hashlib.sha256()
+    for k in sorted(keys):
+        h.update(k.encode())
+        h.update(np.ascontiguousarray(ts_data[k]).tobytes())
+    return h.hexdigest()
+
+def get_problem(portf, tg, ts_data, problem_key):
+    """ get optimization problem: cached problem with refreshed costs, or newly set up
+
+    Args:
+        portf (Portfolio): portfolio
+        tg (Timegrid): timegrid
+        ts_data (dict): time series data
+        problem_key (any): identifies portfolio and timegrid (e.g. data versions)
+
+    Returns:
+        OptimProblem (copy -- may be changed by optimizer)
+    """
+    # lock only for cache access -- problems are set up outside (concurrent requests)
+    structure = ts_digest(ts_data, structural_ts_keys(portf, ts_data))
+    with problem_cache_lock:
+        entry = problem_cache.get(problem_key)
+        if entry is not None: problem_cache.move_to_end(problem_key)
+    if (entry is not None) and (entry['structure'] == structure):
+        c = portf.setup_optim_problem(prices = ts_data, timegrid = tg, costs_only = True)
+        if (len(c) == len(entry['op'].c)) and (not np.isnan(c.sum())):
+            op = copy.copy(entry['op'])
+            op.c = c
+            with problem_cache_lock: problem_cache_stats['reused'] += 1
+            return op
+    op = portf.setup_optim_problem(prices = ts_data, timegrid = tg)
+    # costs can only be refreshed if cost vector is consistent
+    c = portf.setup_optim_problem(prices = ts_data, timegrid = tg, costs_only = True)
+    cacheable = (len(c) == len(op.c)) and np.allclose(c, op.c)
+    if cacheable and (op.A is not None): op.A = op.A.tolil() # format used by optimizer (avoid conversion with each run)
+    with problem_cache_lock:
+        problem_cache_stats['built'] += 1
+        if cacheable:
+            problem_cache[problem_key] = {'op': op, 'structure': structure}
+            while len(problem_cache) > parameters['problem_cache_entries']:
+                problem_cache.popitem(last = False)
+    return copy.copy(op)
+
+############## rolling horizon
+# optimize long timegrids in overlapping windows, one after the other. Only the first 
+# (window - overlap) steps of each window are committed, the overlap is optimized
+# again in the next window. Storage levels at the end of the committed steps are 
+# carried into the next window as start levels. Within windows, storages are 
+# optimized towards their end level (the overlap mitigates the effect)
+# Note: restrictions over the whole horizon (e.g. volume limits of contracts) 
+# only hold within each window
+
+def window_timegrid(tg, i0, i1):
+    """ timegrid for time steps [i0, i1) of timegrid tg """
+    if i1 < tg.T: end = tg.timepoints[i1]
+    else:         end = tg.end
+    return eao.basic_classes.Timegrid(tg.timepoints[i0], end, freq = tg.freq, 
+                                      main_time_unit = tg.main_time_unit, timezone = tg.tz)
+
+def window_ts_data(ts_data, T, i0, i1):
+    """ time series data for time steps [i0, i1) (arrays of length T are cut) """
+    out = {}
+    for k in ts_data:
+        if isinstance(ts_data[k], np.ndarray) and (len(ts_data[k]) == T):
+            out[k] = ts_data[k][i0:i1]
+        else: 
+            out[k] = ts_data[k]
+    return out
+
+def solve_rolling(portf, tg, ts_data, solver = 'standard', window = 96, overlap = 0, limits = None):
+    """ solve optimization problem in rolling horizon mode (see solve). Storage start levels of portf are changed """
+    if (window < 1) or (overlap < 0) or (overlap >= window):
+        s = 'rolling horizon: window must be positive and overlap smaller than window'
+        logging.error(s)
         return s, 400
+    storages = [a for a in portf.assets if isinstance(a, eao.assets.Storage)]
+    step = window - overlap
+    disp, value = [], 0.
+    i0 = 0
+    while i0 < tg.T:
+        i1 = min(i0 + window, tg.T)
+        n_commit = step if i1 < tg.T else i1 - i0
+        try:
+            my_tg = window_timegrid(tg, i0, i1)
+            my_ts = window_ts_data(ts_data, tg.T, i0, i1)
+        except:
+            s = 'rolling horizon: could not create window starting '+str(i0)
+            logging.error(s)
+            return s, 400
+        report_progress('window', window = [i0, i1], n_steps = tg.T)
+        op, res, s = setup_and_optimize(portf, my_tg, my_ts, solver, limits = limits)
+        if s is not None: 
+            return 'rolling horizon, window starting '+str(i0)+': '+s, 400
+        try:
+            out = eao.io.extract_output(portf, op, res)
+            disp.append(out['dispatch'].iloc[:n_commit])
+            value += out['DCF'].iloc[:n_commit].to_numpy().sum()
+            for a in storages: # carry storage levels
+                a.start_level = float(a.fill_level(op, res)[n_commit-1])
+        except:
+            s = 'error - could not extract data'
+            logging.error(s)
+            return s, 400
+        logging.info('rolling horizon: solved window '+str(i0)+' - '+str(i1))
+        i0 += n_commit
+    return {'total value': value, 'dispatch': pd.concat(disp)}, 200
+
+def get_rolling_args():
+    """ rolling horizon arguments from request (query parameters window, overlap)
+    Returns:
+        window, overlap, error message (None if ok)"""
     try:
-        if isinstance(res, str):
+        window  = request.args.get('window', None, type = int)
+        overlap = request.args.get('overlap', 0, type = int)
+    except:
+        window, overlap = None, 0
+    if ('window' in request.args) and (window is None):
+        return None, 0, 'rolling horizon: window must be integer'
+    if (window is not None) and ((window < 1) or (overlap < 0) or (overlap >= window)):
+        return None, 0, 'rolling horizon: window must be positive and overlap smaller than window'
+    return window, overlap, None
+
+def n_windows(T, window = None, overlap = 0):
+    """ number of rolling horizon windows solved one after the other for T time steps (see solve_rolling) """
+    if (window is None) or (window >= T): return 1
+    return int(np.ceil((T - overlap)/(window - overlap)))
+
+############## problem size and admission control
+# before optimizing, the size of the problem is estimated without solving: numbers of variables,
+# constraints and integer variables (problem set up for a few time steps, scaled to the timegrid).
+# Estimated cost = variables + constraints + integer_weight * integer variables decides whether
+# a problem is optimized immediately, only as background job, or refused (see parameters max_cost_...)
+# In rolling horizon mode, the cost is per window times the number of windows (solved one after the other)
+# Solver time limit and MIP gap are passed per request (eao does not pass solver parameters
+# to cvxpy -- they are added to cvxpy's solve call of the current thread, see solver_limits)
+solver_limits_context = threading.local()
+solver_limits_lock    = threading.Lock()
+solver_limits_state   = {'active': 0, 'solve': None} # number of running solves with limits, original cvxpy solve
+
+def estimate_problem(portf, tg, ts_data, window = None):
+    """ estimate size of optimization problem (per rolling horizon window if given) without solving
+
+    Returns:
+        dict: time_steps, sample_steps (set up), exact, variables, constraints, integers, cost
+    """
+    portf, tg = copy.deepcopy((portf, tg)) # setting up changes portfolio, assets and timegrid
+    T = tg.T if window is None else min(window, tg.T)
+    def setup(n):
+        if n == tg.T: return portf.setup_optim_problem(prices = ts_data, timegrid = tg)
+        return portf.setup_optim_problem(prices = window_ts_data(ts_data, tg.T, 0, n), timegrid = window_timegrid(tg, 0, n))
+    n = min(T, parameters['estimate_steps'])
+    try:
+        op = setup(n)
+    except:
+        if n == T: raise
+        n  = T # e.g. restrictions over longer periods -- set up for full horizon
+        op = setup(n)
+    scale = T/n
+    integers = 0
+    if 'bool' in op.mapping:
+        integers = int(((op.mapping['bool'] == True).to_numpy() & ~op.mapping.index.duplicated(keep = 'first')).sum())
+    estimate = {'time_steps': T, 'sample_steps': n, 'exact': n == T,
+                'variables'  : int(round(len(op.c)*scale)),
+                'constraints': int(round((0 if op.A is None else op.A.shape[0])*scale)),
+                'integers'   : int(round(integers*scale))}
+    estimate['cost'] = estimate['variables'] + estimate['constraints'] + parameters['integer_weight']*estimate['integers']
+    return estimate
+
+def admission(estimate):
+    """ 'optimize' (immediately), 'job' (only as background job) or 'refused' by estimated cost """
+    if estimate['cost'] <= parameters['max_cost_optimize']: return 'optimize'
+    if estimate['cost'] <= parameters['max_cost_job']:      return 'job'
+    return 'refused'
+
+def get_estimate(portf, tg, ts_data, window = None, overlap = 0):
+    """ estimate for stored portfolio and timegrid (cached by data versions) with admission.
+        Rolling horizon: windows, cost_per_window and cost of all windows
+    Returns:
+        estimate (dict, see estimate_problem), error message (None if ok) """
+    cache = current_workspace().setdefault('estimates', {})
+    key = (data_version('portf'), data_version('timegrid'), window)
+    if not key in cache:
+        try:
+            estimate = estimate_problem(portf, tg, ts_data, window)
+        except:
+            s = 'error - could not estimate problem size'
             logging.error(s)
-            return res, 400
+            return None, s
+        if len(cache) >= 16: cache.clear()
+        cache[key] = estimate
+    estimate = dict(cache[key])
+    if window is not None:
+        estimate['windows'] = n_windows(tg.T, window, overlap)
+        estimate['cost_per_window'] = estimate['cost']
+        estimate['cost'] *= estimate['windows']
+    estimate['admission'] = admission(estimate)
+    return estimate, None
+
+@app.route('/estimate_problem', methods=['GET'])
+def get_problem_estimate():
+    """ estimated size of optimization problem for stored data (rolling horizon: query parameters window, overlap)
+        returns
+           time_steps, variables, constraints, integers, cost, admission (optimize / job / refused)
+           rolling horizon: sizes per window, windows, cost_per_window """
+    try:
+        tg      = recorder('timegrid', as_obj = True)
+        portf   = recorder('portf', as_obj = True)
+        ts_data = recorder('time_series_data', as_obj = True)
+    except:
+        s = 'could not load data for optimization'
+        logging.error(s)
+        return s, 400
+    window, overlap, s = get_rolling_args()
+    if s is not None: return s, 400
+    estimate, s = get_estimate(portf, tg, ts_data, window, overlap)
+    if s is not None: return s, 400
+    return estimate, 200
+
+def get_solver_limits():
+    """ solver limits from request (query parameters time_limit (s), mip_gap) or parameters
+    Returns:
+        dict of given limits, error message (None if ok) """
+    limits = {}
+    for k in ('time_limit', 'mip_gap'):
+        v = request.args.get(k, parameters.get(k))
+        if v is None: continue
+        try:
+            v = float(v)
+        except ValueError:
+            v = -1.
+        if (v < 0) or ((k == 'time_limit') and (v == 0)):
+            s = k+' must be a positive number'
+            logging.error(s)
+            return {}, s
+        limits[k] = v
+    return limits, None
+
+def solver_kwargs(solver, limits):
+    """ arguments for cvxpy solve with time limit and relative MIP gap for solver """
+    t, gap = limits.get('time_limit'), limits.get('mip_gap')
+    kwargs = {}
+    if solver == 'SCIP':
+        params = {}
+        if t   is not None: params['limits/time'] = t
+        if gap is not None: params['limits/gap']  = gap
+        kwargs['scip_params'] = params
+    elif solver == 'HIGHS':
+        if t   is not None: kwargs['time_limit']  = t
+        if gap is not None: kwargs['mip_rel_gap'] = gap
+    elif limits_supported(solver, limits):
+        kwargs['mi_rel_eps'] = gap
+    else: # checked before solving (check_solver_limits)
+        logging.warning('solver limits '+str(limits)+' not supported for solver '+str(solver)+' - ignored')
+    return kwargs
+
+def limits_supported(solver, limits):
+    """ True if solver limits can be passed to (cvxpy) solver """
+    if solver in ('SCIP', 'HIGHS'): return True
+    return (solver == 'ECOS_BB') and (set(limits) == {'mip_gap'})
+
+def check_solver_limits(limits, solver, estimate):
+    """ error message if limits cannot be applied to the solver used for the problem (None if ok) """
+    if not limits: return None
+    # solver as chosen by eao: SCIP for MIP by default, else left to cvxpy
+    if (solver is None) or (solver == 'standard'): used = 'SCIP' if estimate['integers'] > 0 else None
+    elif solver.upper() == 'CVXPY':                used = None
+    else:                                          used = solver
+    if limits_supported(used, limits): return None
+    s = 'solver limits '+str(sorted(limits))+' not supported for '+('solver chosen by cvxpy' if used is None else 'solver '+used)
+    s += ' - choose solver SCIP or HIGHS (/set_solver)'
+    logging.error(s)
+    return s
+
+@contextlib.contextmanager
+def solver_limits(limits):
+    """ apply solver limits to cvxpy solve calls of current thread. cvxpy.Problem.solve is wrapped 
+        only while solves with limits are running (calls of other threads are passed unchanged) """
+    if not limits:
+        yield
+        return
+    import cvxpy
+    with solver_limits_lock:
+        if solver_limits_state['active'] == 0:
+            solve = solver_limits_state['solve'] = cvxpy.Problem.solve
+            def solve_with_limits(self, *args, **kwargs):
+                limits = getattr(solver_limits_context, 'limits', None)
+                if limits: kwargs.update(solver_kwargs(kwargs.get('solver'), limits))
+                return solve(self, *args, **kwargs)
+            cvxpy.Problem.solve = solve_with_limits
+        solver_limits_state['active'] += 1
+    solver_limits_context.limits = limits
+    try:
+        yield
+    finally:
+        solver_limits_context.limits = None
+        with solver_limits_lock:
+            solver_limits_state['active'] -= 1
+            if solver_limits_state['active'] == 0:
+                cvxpy.Problem.solve = solver_limits_state['solve']
+
+############## results output formats
+# results are sent as JSON (default), or -- faster for large results -- columnar
+# straight from the dispatch DataFrame: Arrow IPC, npz, csv
+# choose by query parameter format=json|arrow|npz|csv or by Accept header
+# time index as str (default) or seconds since epoch (query parameter time_index=epoch)
+result_mimetypes = {'json' : 'application/json',
+                    'arrow': 'application/vnd.apache.arrow.stream',
+                    'npz'  : 'application/x-npz',
+                    'csv'  : 'text/csv'}
+
+def epoch_seconds(index):
+    """ time index as seconds since epoch (UTC) """
+    return index.values.astype('datetime64[s]').astype(np.int64)
+
+def results_to_json(res, time_index = 'str'):
+    """ collect results neatly for easy json """
+    disp = res['dispatch']
+    send = {}
+    send['total value'] = res['total value']
+    if time_index == 'epoch':
+        send['time_index'] = epoch_seconds(disp.index).tolist()
+    else:
+        send['time_index'] = disp.index.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    for col in disp.columns:
+        send[col] = disp[col].to_numpy().tolist()
+    return send
+
+def stream_csv(res, time_index = 'str'):
+    """ results as CSV, generator of bytes written in row chunks (no full CSV string) """
+    disp = res['dispatch'].copy(deep = False)
+    if time_index == 'epoch': disp.index = epoch_seconds(disp.index)
+    disp.index.name = 'time_index'
+    rows = max(1, parameters['stream_chunk_size']//(20*(len(disp.columns)+1))) # estimate ~20 bytes per value
+    yield disp.iloc[:0].to_csv().encode() # header
+    for i in range(0, len(disp), rows):
+        yield disp.iloc[i:i+rows].to_csv(header = False).encode()
+
+def results_to_bytes(res, fmt, time_index = 'str'):
+    """ results in binary/columnar format (arrow, npz) """
+    disp = res['dispatch']
+    if fmt == 'npz':
+        arrays = {'total_value': np.asarray(res['total value'])}
+        if time_index == 'epoch': arrays['time_index'] = epoch_seconds(disp.index)
+        else:                     arrays['time_index'] = disp.index.values.astype('datetime64[s]')
+        for col in disp.columns:
+            arrays[col] = disp[col].to_numpy()
+        buf = io.BytesIO()
+        np.savez(buf, **arrays)
+        return buf.getvalue()
+    elif fmt == 'arrow':
+        import pyarrow as pa
+        cols = {}
+        if time_index == 'epoch': cols['time_index'] = pa.array(epoch_seconds(disp.index))
+        else:                     cols['time_index'] = pa.array(disp.index.values.astype('datetime64[s]'))
+        for col in disp.columns:
+            cols[str(col)] = pa.array(disp[col].to_numpy())
+        table = pa.table(cols, metadata = {'total value': str(res['total value'])})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise ValueError('unknown results format '+str(fmt))
+
+def send_results(res):
+    """ create response with optimization results in format requested by client """
+    fmt = request.args.get('format')
+    if fmt is None:
+        best = request.accept_mimetypes.best_match(list(result_mimetypes.values()), default = 'application/json')
+        fmt  = [k for k in result_mimetypes if result_mimetypes[k] == best][0]
+    time_index = request.args.get('time_index', 'str')
+    if not fmt in result_mimetypes:
+        s = 'unknown results format '+str(fmt)+'. Choose from '+str(list(result_mimetypes))
+        logging.error(s)
+        return s, 400
+    if fmt == 'json':
+        size = 20*res['dispatch'].size # estimate
+        return json_response(results_to_json(res, time_index = time_index), size)
+    if fmt == 'csv':
+        return Response(stream_csv(res, time_index = time_index), mimetype = result_mimetypes[fmt],
+                        headers = {'X-Total-Value': str(res['total value'])})
+    try:
+        body = results_to_bytes(res, fmt, time_index = time_index)
+    except ImportError:
+        s = 'results format '+fmt+' not supported - pyarrow not installed'
+        logging.error(s)
+        return s, 400
+    return Response(body, mimetype = result_mimetypes[fmt], headers = {'X-Total-Value': str(res['total value'])})
+
+############## result cache
+# LRU cache of optimization results, addressed by the hash of the input data
+# (portfolio, timegrid, time series data) and the solver. Bounded by the
+# (estimated) memory size of stored results parameters['result_cache_size']
+result_cache = OrderedDict()
+result_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0}
+result_cache_lock = threading.Lock()
+
+def result_cache_key(digests, solver, window = None, overlap = 0, limits = None):
+    """ cache key from digests of input data, solver, rolling horizon settings and solver limits """
+    key = '|'.join(digests)+'|'+str(solver)+'|'+str(window)+'|'+str(overlap)
+    if limits: key += '|'+json.dumps(limits, sort_keys = True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+def result_size(res):
+    """ rough estimate of memory size of results in bytes """
+    return int(res['dispatch'].memory_usage(index = True).sum()) + 100
+
+def result_cache_get(key):
+    """ get results from cache (None if not cached) """
+    with result_cache_lock:
+        if key in result_cache:
+            result_cache.move_to_end(key)
+            result_cache_stats['hits'] += 1
+            return result_cache[key][0]
+        result_cache_stats['misses'] += 1
+        return None
+
+def result_cache_put(key, res):
+    """ put results in cache, evicting least recently used results if needed """
+    size = result_size(res)
+    with result_cache_lock:
+        if size > parameters['result_cache_size']: return # too large to cache
+        if key in result_cache:
+            result_cache_stats['size'] -= result_cache.pop(key)[1]
+        result_cache[key] = (res, size)
+        result_cache_stats['size'] += size
+        while result_cache_stats['size'] > parameters['result_cache_size']:
+            _, (_, old_size) = result_cache.popitem(last = False)
+            result_cache_stats['size']      -= old_size
+            result_cache_stats['evictions'] += 1
+
+@app.route('/get_result_cache_info', methods=['GET'])
+def get_result_cache_info():
+    """ get statistics of result cache (hits, misses, ...) """
+    with result_cache_lock:
+        out = dict(result_cache_stats)
+        out['entries']  = len(result_cache)
+        out['max_size'] = parameters['result_cache_size']
+    out['problem_cache'] = dict(problem_cache_stats)
+    return out, 200
+
+@app.route('/flush_result_cache', methods=['GET'])
+def flush_result_cache():
+    """ delete all cached optimization results """
+    with result_cache_lock:
+        result_cache.clear()
+        result_cache_stats['size'] = 0
+    logging.info('flushed result cache')
+    return 'done', 200
+
+############## asynchronous optimization jobs
+# long optimizations are run by a pool of background workers. Submitting takes
+# a snapshot of the stored input data (cached objects -- new versions are new objects), so later
+# changes on the server do not interfere with queued or running jobs. Jobs set up their problems on
+# copies of portfolio and timegrid (see solve), so they do not race with other solves on the snapshot
+#  job status: queued -> running -> done / failed / cancelled
+# job records (status, results) and input snapshots are kept by the recorder backend, so that status 
+# and results are available in all server processes. Jobs are run by the submitting process (owner).
+# If the owner process ended (e.g. worker restarted), other processes take over its queued jobs
+# and mark its running jobs failed (see recover_jobs, processes on one host)
+jobs = dict() # local: job id -> future (and input snapshot until started)
+jobs_lock = threading.Lock()
+job_executor = None
+last_job_recovery = 0.
+
+def get_job_executor():
+    """ pool of background workers (created on first use) """
+    global job_executor
+    if job_executor is None:
+        job_executor = ThreadPoolExecutor(max_workers = parameters['n_job_workers'], thread_name_prefix = 'eao_job')
+    return job_executor
+
+def run_job(job_id):
+    """ run optimization for a submitted job (in background worker) """
+    with jobs_lock:
+        snapshot = jobs.pop(job_id, {}).get('input')
+    def start(job):
+        if job['status'] != 'queued': return False # cancelled meanwhile
+        job['status']  = 'running'
+        job['started'] = time.time()
+        return True
+    started, job = get_backend().update_job(job_id, start)
+    if not started:
+        get_backend().drop_job_input(job_id)
+        return
+    if snapshot is None: snapshot = get_backend().get_job_input(job_id) # job taken over from other process
+    res, code = result_cache_get(job['cache_key']), 200
+    if res is None:
+        progress_context.job_id = job_id
+        try:
+            report_progress('loading')
+            tg, portf, ts_data = snapshot['timegrid'], snapshot['portf'], snapshot['time_series_data']
+            res, code = solve(portf, tg, ts_data, solver = job['solver'], window = job['window'], overlap = job['overlap'],
+                              limits = job.get('limits'))
+        except:
+            res, code = 'could not load data for optimization', 400
+        finally:
+            progress_context.job_id = None
+        if code == 200: result_cache_put(job['cache_key'], res)
+    def finish(job):
+        job['finished'] = time.time()
+        if job['status'] == 'cancelling':
+            job['status'] = 'cancelled'
+        elif code == 200:
+            job['status'] = 'done'
+            job['result'] = res
         else:
-            out = eao.io.extract_output(portf, op, res)
-            ### collect results neatly for easy json
-            send = {}
-            send['total value'] = res.value
-            send['time_index']  = list(out['dispatch'].index.strftime('%Y-%m-%d %H:%M:%S'))
-            for col in out['dispatch'].columns:
-                send[col] = list(out['dispatch'][col])
-            return send
+            job['status'] = 'failed'
+            job['error']  = res
+        add_progress_event(job, {'time': job['finished'], 'phase': job['status']})
+        return True
+    _, job = get_backend().update_job(job_id, finish)
+    get_backend().drop_job_input(job_id)
+    if job['status'] == 'cancelled':
+        logging.info('job '+job_id+' cancelled, result discarded')
+    elif job['status'] == 'done':
+        logging.info('job '+job_id+' done')
+    else:
+        logging.error('job '+job_id+' failed: '+str(res))
+
+def job_info(job):
+    """ status of job as dict (without results) """
+    info = {'job_id': job['job_id'], 'status': job['status'], 'solver': job['solver']}
+    for k in ('submitted', 'started', 'finished'):
+        info[k] = job[k]
+    if job['error'] is not None: info['error'] = job['error']
+    if 'phase' in job: info['phase'] = job['phase']
+    return info
+
+def process_alive(pid):
+    """ True if process with pid is running (on this host) """
+    if pid == os.getpid(): return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def recover_jobs():
+    """ take over queued jobs of ended server processes, mark their running jobs failed 
+        (at most every parameters['job_recovery_interval'] seconds) """
+    global last_job_recovery
+    now = time.time()
+    if now - last_job_recovery < parameters['job_recovery_interval']: return
+    last_job_recovery = now
+    b = get_backend()
+    for job_id, ws, status in b.job_list():
+        if not status in ('queued', 'running', 'cancelling'): continue
+        owner = b.get_job(job_id).get('owner')
+        if (owner is None) or process_alive(owner): continue
+        def take_over(job):
+            if job.get('owner') != owner: return False # taken over by other process meanwhile
+            if job['status'] == 'queued':
+                job['owner'] = os.getpid()
+            else:
+                job['finished'] = time.time()
+                job['status']   = 'failed' if job['status'] == 'running' else 'cancelled'
+                job['error']    = 'server process running the job ended'
+                add_progress_event(job, {'time': job['finished'], 'phase': job['status']})
+            return True
+        changed, job = b.update_job(job_id, take_over)
+        if not changed: continue
+        if job['status'] == 'queued':
+            logging.info('taking over job '+job_id+' of ended process '+str(owner))
+            with jobs_lock:
+                jobs[job_id] = {'future': get_job_executor().submit(run_job, job_id)}
+        else:
+            b.drop_job_input(job_id)
+            logging.error('job '+job_id+' '+job['status']+': process '+str(owner)+' ended')
+
+def clean_up_jobs():
+    """ forget oldest finished jobs if more than parameters['max_jobs'] are recorded """
+    all_jobs = get_backend().job_list()
+    finished = [k for k, ws, status in all_jobs if status in ('done', 'failed', 'cancelled')]
+    n_delete = len(all_jobs) - parameters['max_jobs']
+    for k in finished[:max(n_delete, 0)]:
+        get_backend().delete_job(k)
+
+@app.route('/optimize_submit', methods=['GET'])
+def optimize_submit():
+    """ submit optimization of stored portfolio, timegrid and time series data as background job
+        rolling horizon mode by query parameters window and overlap, solver limits by time_limit, mip_gap 
+        (see /optimize). Problems above parameters['max_cost_job'] are refused (see /estimate_problem)
+        returns 
+           job id """
+    for k in ('portf', 'timegrid', 'time_series_data'):
+        if data_version(k) == 0:
+            s = 'could not submit job. '+k+' not stored'
+            logging.error(s)
+            return s, 400
+    window, overlap, s = get_rolling_args()
+    if s is not None: return s, 400
+    limits, s = get_solver_limits()
+    if s is not None: return s, 400
+    try: # new versions are new objects -- copied by solve when the job starts
+        snapshot = {k: recorder(k, as_obj = True) for k in ('portf', 'timegrid', 'time_series_data')}
     except:
-        s = 'error - could not extract data'
+        s = 'could not submit job. could not load data'
+        logging.error(s)
+        return s, 400
+    estimate, s = get_estimate(snapshot['portf'], snapshot['timegrid'], snapshot['time_series_data'], window, overlap)
+    if s is not None: return s, 400
+    if estimate['admission'] == 'refused':
+        s = 'problem too expensive to optimize (estimated cost '+str(estimate['cost'])+')'
         logging.error(s)
         return s, 400
+    solver    = get_solver()
+    s = check_solver_limits(limits, solver, estimate)
+    if s is not None: return s, 400
+    cache_key = result_cache_key([data_digest(k) for k in ('portf', 'timegrid', 'time_series_data')], solver, window, overlap, limits)
+    job_id = uuid.uuid4().hex
+    recover_jobs()
+    clean_up_jobs()
+    get_backend().put_job(job_id, {'job_id': job_id, 'status': 'queued', 'workspace': workspace_id(), 'solver': solver,
+                                   'cache_key': cache_key, 'window': window, 'overlap': overlap, 'limits': limits,
+                                   'submitted': time.time(), 'started': None, 'finished': None,
+                                   'result': None, 'error': None, 'owner': os.getpid()},
+                          input = snapshot)
+    with jobs_lock:
+        jobs[job_id] = {'input': snapshot}
+        jobs[job_id]['future'] = get_job_executor().submit(run_job, job_id)
+    logging.info('submitted job '+job_id)
+    return json.dumps(job_id), 200
+
+def get_job_id():
+    """ job id from request. returns job id and error message (None if ok) """
+    recover_jobs()
+    job_id = request.get_json()
+    if not isinstance(job_id, str) or get_backend().get_job(job_id) is None:
+        s = 'no valid job id: '+str(job_id)
+        logging.error(s)
+        return job_id, s
+    return job_id, None
+
+@app.route('/job_status', methods=['PUT'])
+def job_status():
+    """ get status of job (arg: job id) """
+    job_id, s = get_job_id()
+    if s is not None: return s, 400
+    return job_info(get_backend().get_job(job_id)), 200
+
+@app.route('/get_jobs', methods=['GET'])
+def get_jobs():
+    """ get status of all recorded jobs (of workspace) """
+    recover_jobs()
+    b = get_backend()
+    out = [job_info(b.get_job(k)) for k, ws, status in b.job_list() if ws == workspace_id()]
+    return json.dumps(out), 200
+
+@app.route('/job_result', methods=['PUT'])
+def job_result():
+    """ get results of finished job (arg: job id). Results as given by /optimize (incl. formats) """
+    job_id, s = get_job_id()
+    if s is not None: return s, 400
+    job = get_backend().get_job(job_id, with_result = True)
+    if job['status'] == 'done':
+        return send_results(job['result'])
+    elif job['status'] == 'failed':
+        return job['error'], 400
+    else:
+        s = 'job '+job_id+' is '+job['status']+' - no results available'
+        logging.info(s)
+        return s, 409
+
+@app.route('/job_cancel', methods=['PUT'])
+def job_cancel():
+    """ cancel job (arg: job id). Queued jobs are not run, results of running jobs are discarded """
+    job_id, s = get_job_id()
+    if s is not None: return s, 400
+    def cancel(job):
+        if job['status'] == 'queued':
+            job['status']   = 'cancelled'
+            job['finished'] = time.time()
+        elif job['status'] == 'running':
+            # solver cannot be interrupted. discard result when done
+            job['status'] = 'cancelling'
+        else:
+            return False
+        return True
+    changed, job = get_backend().update_job(job_id, cancel)
+    if not changed:
+        s = 'job '+job_id+' already '+job['status']
+        logging.info(s)
+        return s, 200
+    if job['status'] == 'cancelled':
+        with jobs_lock:
+            if job_id in jobs and jobs[job_id]['future'].cancel(): # submitted here, free input
+                del jobs[job_id]
+        get_backend().drop_job_input(job_id)
+    s = 'job '+job_id+' '+job['status']
+    logging.info(s)
+    return s, 200
+
+############## job progress
+# running jobs report phases (loading, setup, solving, extracting, rolling horizon windows) and
+# log messages of the job's thread to the job record. /job_progress streams them as server-sent events
+# Note: eao calls solvers through cvxpy without callbacks or solver log -- solver output
+# and MIP incumbent / bound updates are not available
+progress_context = threading.local() # job id of job run by current thread
+
+def add_progress_event(job, event):
+    """ add event to job record (within update_job) """
+    event['seq'] = job.get('progress_seq', 0)
+    job['progress_seq'] = event['seq'] + 1
+    job['progress'] = (job.get('progress', []) + [event])[-parameters['max_progress_events']:] # new list (records may be shared)
+    if 'phase' in event: job['phase'] = event['phase']
+
+def report_progress(phase = None, log = None, **info):
+    """ record progress of job run by current thread (no effect outside jobs) """
+    job_id = getattr(progress_context, 'job_id', None)
+    if (job_id is None) or getattr(progress_context, 'reporting', False): return
+    event = {'time': time.time()}
+    if phase is not None: event['phase'] = phase
+    if log   is not None: event['log']   = log
+    event.update(info)
+    def add(job):
+        add_progress_event(job, event)
+        return True
+    progress_context.reporting = True # no recursion by log messages of backend
+    try:
+        get_backend().update_job(job_id, add)
+    except:
+        pass # job record removed meanwhile
+    finally:
+        progress_context.reporting = False
+
+class JobLogHandler(logging.Handler):
+    """ log messages of threads running a job are part of job progress """
+    def emit(self, record):
+        if getattr(progress_context, 'job_id', None) is not None:
+            report_progress(log = record.levelname+': '+record.getMessage())
+
+logging.getLogger().addHandler(JobLogHandler())
+
+@app.route('/job_progress', methods=['GET'])
+def job_progress():
+    """ progress of job as server-sent events (text/event-stream). Job id by query parameter job_id
+        events: progress (phase changes and log messages as JSON, with id), 
+                end (job status as in /job_status) when job is finished
+        reconnecting clients (header Last-Event-ID) get the events they missed """
+    recover_jobs()
+    job_id = request.args.get('job_id')
+    b = get_backend()
+    if (job_id is None) or (b.get_job(job_id) is None):
+        s = 'no valid job id: '+str(job_id)
+        logging.error(s)
+        return s, 400
+    try:
+        last = int(request.headers.get('Last-Event-ID', -1))
+    except ValueError:
+        last = -1
+    def events():
+        seq, t_sent = last, time.time()
+        while True:
+            job = b.get_job(job_id)
+            if job is None:
+                yield 'event: end\ndata: '+json.dumps({'job_id': job_id, 'status': 'unknown'})+'\n\n'
+                return
+            for e in job.get('progress', []):
+                if e['seq'] > seq:
+                    seq, t_sent = e['seq'], time.time()
+                    yield 'id: '+str(seq)+'\nevent: progress\ndata: '+json.dumps(e)+'\n\n'
+            if job['status'] in ('done', 'failed', 'cancelled'):
+                yield 'event: end\ndata: '+json.dumps(job_info(job))+'\n\n'
+                return
+            if time.time() - t_sent > 15:
+                yield ': keep alive\n\n'
+                t_sent = time.time()
+            time.sleep(parameters['progress_poll_interval'])
+    return Response(events(), mimetype = 'text/event-stream', headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+############## batch optimization of scenarios
+# the stored portfolio and timegrid are optimized for a number of named time series
+# data sets (e.g. price scenarios). Scenarios are distributed over a pool of processes,
+# kept alive over requests. Workers are started by forkserver (or spawn) -- the threaded server
+# is not forked. Each worker deserializes portfolio and timegrid only once per inputs (by digest)
+# and sets up the problem once -- per scenario only the costs are refreshed (see get_problem)
+scenario_worker = dict() # in worker process: inputs key, portfolio, timegrid
+scenario_pool = None
+scenario_pool_lock = threading.Lock()
+
+def get_scenario_pool():
+    """ pool of worker processes for scenario optimization (created on first use) """
+    global scenario_pool
+    with scenario_pool_lock:
+        if scenario_pool is None:
+            n_processes = parameters['n_processes']
+            if n_processes is None: n_processes = os.cpu_count()
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            scenario_pool = ProcessPoolExecutor(max_workers = max(1, n_processes), mp_context = multiprocessing.get_context(method))
+        return scenario_pool
+
+def reset_scenario_pool():
+    """ drop pool (e.g. broken by crashed worker), new pool on next use """
+    global scenario_pool
+    with scenario_pool_lock:
+        if scenario_pool is not None: scenario_pool.shutdown(wait = False, cancel_futures = True)
+        scenario_pool = None
+
+def scenario_inputs(key, portf_json, tg_json):
+    """ portfolio and timegrid in worker process (deserialized once per inputs key) """
+    if scenario_worker.get('key') != key:
+        portf = eao.serialization.load_from_json(portf_json)
+        tg    = eao.serialization.load_from_json(tg_json)
+        portf.set_timegrid(tg)
+        scenario_worker.update({'key': key, 'portf': portf, 'tg': tg})
+    return scenario_worker['portf'], scenario_worker['tg']
+
+def solve_scenario(inputs, name, ts_data):
+    """ optimize one scenario in worker process. 
+        inputs: (key, portfolio JSON, timegrid JSON, solver, limits). returns name, results, status code """
+    key, portf_json, tg_json, solver, limits = inputs
+    try:
+        portf, tg = scenario_inputs(key, portf_json, tg_json)
+        res, code = solve(portf, tg, ts_data, solver = solver, problem_key = key, limits = limits)
+    except:
+        res, code = 'error - could not optimize scenario', 400
+    return name, res, code
+
+@app.route('/optimize_scenarios', methods=['PUT'])
+def optimize_scenarios():
+    """ optimize stored portfolio and timegrid for several sets of time series data
+        arg
+           dict {scenario name: time series data (as in set_time_series_data)}
+        returns 
+           dict {scenario name: results as given by /optimize (JSON) or {'error': message}} """
+    scenarios = request.get_json()
+    if not isinstance(scenarios, dict) or len(scenarios) == 0:
+        s = 'scenarios must be given as dict of scenario name and time series data'
+        logging.error(s)
+        return s, 400
+    portf_json = recorder('portf')
+    tg_json    = recorder('timegrid')
+    if portf_json is None or tg_json is None:
+        s = 'portfolio and timegrid must be stored to optimize scenarios'
+        logging.error(s)
+        return s, 400
+    ts = {}
+    for k in scenarios:
+        try:
+            ts[k] = parse_ts_data(scenarios[k])
+        except ValueError as e:
+            s = 'scenario '+str(k)+': '+str(e)
+            logging.error(s)
+            return s, 400
+    limits, s = get_solver_limits()
+    if s is not None: return s, 400
+    try:
+        estimate, s = get_estimate(recorder('portf', as_obj = True), recorder('timegrid', as_obj = True), next(iter(ts.values())))
+    except:
+        estimate, s = None, 'could not load data for optimization'
+    if s is not None: return s, 400
+    if estimate['admission'] != 'optimize':
+        s = 'problem too expensive to optimize scenarios (estimated cost '+str(estimate['cost'])+')'
+        logging.error(s)
+        return s, 400
+    solver = get_solver()
+    s = check_solver_limits(limits, solver, estimate)
+    if s is not None: return s, 400
+    inputs = (data_digest('portf')+'|'+data_digest('timegrid'), portf_json, tg_json, solver, limits)
+    release_workspace() # inputs taken
+    out = {}
+    try:
+        pool = get_scenario_pool()
+        for name, res, code in pool.map(solve_scenario, itertools.repeat(inputs), list(ts), list(ts.values())):
+            if code == 200: out[name] = results_to_json(res, time_index = request.args.get('time_index', 'str'))
+            else:           out[name] = {'error': res}
+    except:
+        reset_scenario_pool()
+        s = 'error - could not optimize scenarios'
+        logging.error(s)
+        return s, 400
+    logging.info('optimized '+str(len(ts))+' scenarios')
+    return out, 200
 
 def get_obj(key = 'portf'):
-    """ retrieve stored data object by data key """    
-    obj = recorder(key = key)
-    if obj is None: 
+    """ retrieve stored data object by data key (cached, do not manipulate) """    
+    if data_version(key) == 0: # no JSON built for values stored as objects
         s = key+' not stored'
         logging.error(s)
         return s
     try:
-        obj = eao.serialization.load_from_json(obj)
+        obj = recorder(key = key, as_obj = True)
     except:
         s = 'invalid json'
         logging.error(s)
         return s
     return obj
 
+############## schema registry
+# argument types and docs of eao classes are collected once (at import, or on first use with
+# lazy_init) and served from memory. Parameter trees depend on the object -- they are cached
+# per workspace with the version of the stored asset / portfolio
+schema_registry = None
+schema_registry_lock = threading.Lock()
+schema_modules = ('assets', 'basic_classes', 'portfolio', 'serialization', 'optimization') # lookup order
+schema_aliases = {'node': 'Node', 'unit': 'Unit', 'timegrid': 'Timegrid', 'startendvaluedict': 'StartEndValueDict'}
+
+def class_schema(cls):
+    """ arguments (type hints as str) and doc of class. None if not available """
+    try:
+        if issubclass(cls, dict) and hasattr(cls, '__annotations__'): # TypedDict
+            args = typing.get_type_hints(cls)
+        else:
+            args = typing.get_type_hints(cls.__init__)
+    except:
+        return None
+    return {'arguments': {k: str(args[k]) for k in args}, 'doc': cls.__init__.__doc__}
+
+def get_schema_registry():
+    """ registry {'classes': {name: schema or None}, 'by_class': {class: schema}, 'bundle': JSON} """
+    global schema_registry
+    with schema_registry_lock:
+        if schema_registry is None:
+            t0 = time.perf_counter()
+            classes, by_class, bundle = {}, {}, {'aliases': schema_aliases, 'classes': {}}
+            for m in schema_modules:
+                for k, v in vars(getattr(eao, m)).items():
+                    if (k in classes) or not isinstance(v, type): continue
+                    if not v in by_class: by_class[v] = class_schema(v)
+                    classes[k] = by_class[v]
+                    if classes[k] is None: continue
+                    classes[k]['arguments_json'] = json.dumps(classes[k]['arguments'])
+                    if v.__module__.startswith('eaopack'): # bundle without imported third party classes
+                        bundle['classes'][k] = {'arguments': classes[k]['arguments'], 'doc': classes[k]['doc']}
+            schema_registry = {'classes': classes, 'by_class': by_class, 'bundle': json.dumps(bundle)}
+            startup_timing['schema registry'] = time.perf_counter() - t0
+        return schema_registry
+
+@app.route('/get_schema', methods=['GET'])
+def get_schema():
+    """ whole schema bundle: arguments and docs of all eao classes (by class name) and aliases
+        (static per server version -- can be cached by clients) """
+    return Response(get_schema_registry()['bundle'], mimetype = 'application/json')
+
+def object_details(key, obj):
+    """ parameter tree, doc and arguments of stored object (cached with version of key) """
+    ws = current_workspace()
+    version = data_version(key)
+    cache = ws.setdefault('details', {})
+    if (key in cache) and (cache[key][0] == version):
+        return cache[key][1]
+    params, param_dict  = eao.io.get_params_tree(obj)
+    out = {'parameters': param_dict, 'parameter_tree':params}
+    schema = get_schema_registry()['by_class'].get(type(obj)) or class_schema(type(obj))
+    out['doc'] = schema['doc']
+    out['arguments'] = schema['arguments']
+    cache[key] = (version, out)
+    return out
+
 @app.route('/get_asset_details', methods=['PUT'])
 def get_asset_details():
     """ get details for a specific asset that is part of the portfolio (arg: asset name)"""
@@ -359,24 +2555,16 @@ def get_asset_details():
         s = 'get asset details - requires asset name'
         logging.error(s)
         return s, 400
-    portf = get_obj('portf')
-    if not isinstance(portf, eao.portfolio.Portfolio):
-        logging.error('no valid porftolio in recorder')
-        return portf, 400
-    if not key in portf.asset_names:
+    names = recorder('portf_asset_names')
+    if names is None:
+        s = 'portf not stored'
+        logging.error(s)
+        return s, 400
+    if not key in names:
         s = 'get asset details -  asset name not in portfolio'
         logging.error(s)
         return s, 400
-    a = portf.get_asset(key)
-    params, param_dict  = eao.io.get_params_tree(a)
-    out = {'parameters': param_dict, 'parameter_tree':params}
-    out['doc'] = a.__init__.__doc__
-    args  = typing.get_type_hints(a.__init__)
-    for k in args:
-        args[k] = str(args[k])
-    out['arguments'] = args
-
-    return out, 200
+    return etag_response(data_etag(asset_key(key)), lambda: (object_details(asset_key(key), recorder(asset_key(key), as_obj = True)), 200))
 
 @app.route('/set_asset_parameter', methods=['PUT'])
 def set_asset_details():
@@ -397,21 +2585,19 @@ def set_asset_details():
         s = 'get asset details - requires asset name'
         logging.error(s)
         return s, 400
-    portf = get_obj('portf')
-    if not isinstance(portf, eao.portfolio.Portfolio):
-        logging.error('no valid porftolio in recorder')
-        return portf, 400
-    if not arg[0] in portf.asset_names:
+    names = recorder('portf_asset_names')
+    if names is None:
+        s = 'portf not stored'
+        logging.error(s)
+        return s, 400
+    if not arg[0] in names:
         s = 'get asset details -  asset name not in portfolio'
         logging.error(s)
         return s, 400
-    # get assets and change right asset
-    assets = portf.assets
-    idx = portf.asset_names.index(arg[0])
-    assets[idx] = eao.io.set_param(assets[idx],arg[1], arg[2])
-    portf = eao.portfolio.Portfolio(assets)
+    # change only this asset (set_param returns new asset -- cached asset not manipulated)
     try:
-        recorder(key = 'portf', in_data=eao.serialization.to_json(portf))
+        a = eao.io.set_param(recorder(asset_key(arg[0]), as_obj = True), arg[1], arg[2])
+        set_portf_assets({arg[0]: a})
     except:
         s = 'could not set parameter'
         logging.info(s)
@@ -424,20 +2610,18 @@ def set_asset_details():
 @app.route('/get_portf_details', methods=['GET'])
 def get_portf_details():
     """ get details for the portfolio"""
-    portf = get_obj('portf')
-    if not isinstance(portf, eao.portfolio.Portfolio):
+    if data_version('portf') == 0:
         s = 'no valid portfolio stored'
         logging.error(s)
         return s, 400
-    params, param_dict  = eao.io.get_params_tree(portf)
-    out = {'parameters': param_dict, 'parameter_tree':params}
-    out['doc'] = portf.__init__.__doc__
-    args  = typing.get_type_hints(portf.__init__)
-    for k in args:
-        args[k] = str(args[k])
-    out['arguments'] = args
-
-    return out, 200
+    def details():
+        portf = get_obj('portf')
+        if not isinstance(portf, eao.portfolio.Portfolio):
+            s = 'no valid portfolio stored'
+            logging.error(s)
+            return s, 400
+        return object_details('portf', portf), 200
+    return etag_response(data_etag('portf'), details)
 
 @app.route('/get_object_details', methods=['PUT'])
 def get_object_details():
@@ -454,30 +2638,17 @@ def get_object_details():
         # info
         return " Covering the following classes. Give key: ['Node', 'Unit', 'Timegrid', 'StartEndValue'] --  __class__ / asset_type name (see JSONs)"
     try:
-        if   key.lower() == 'node':          s = typing.get_type_hints(eao.basic_classes.Node.__init__)
-        elif key.lower() == 'unit':          s = typing.get_type_hints(eao.basic_classes.Unit.__init__)
-        elif key.lower() == 'timegrid':      s = typing.get_type_hints(eao.basic_classes.Timegrid.__init__)    
-        elif key.lower() == 'startendvaluedict': s =  typing.get_type_hints(eao.basic_classes.StartEndValueDict)
-        else: # __class__ name or asset_type
-            try:
-                if   key in vars(eao.assets):        obj = vars(eao.assets)[key]
-                elif key in vars(eao.basic_classes): obj = vars(eao.basic_classes)[key]
-                elif key in vars(eao.portfolio):     obj = vars(eao.portfolio)[key]
-                elif key in vars(eao.serialization): obj = vars(eao.serialization)[key]
-                elif key in vars(eao.optimization):  obj = vars(eao.optimization)[key]
-                else: 
-                    s = key + ' not found in objects'
-                    logging.error(s)
-                    return s, 400
-                s = typing.get_type_hints(obj.__init__)
-            except:
-                s = 'unable to get_object_details for '+str(key)
-                logging.error(s)
-                return s, 400
-        if isinstance(s, dict):
-            for k in s:
-                s[k] = str(s[k])
-            s = json.dumps(s)
+        classes = get_schema_registry()['classes']
+        if isinstance(key, str) and (key.lower() in schema_aliases): key = schema_aliases[key.lower()]
+        if not key in classes:
+            s = key + ' not found in objects'
+            logging.error(s)
+            return s, 400
+        if classes[key] is None:
+            s = 'unable to get_object_details for '+str(key)
+            logging.error(s)
+            return s, 400
+        s = classes[key]['arguments_json']
     except:
         s = 'error. could not retrieve object details '
         logging.error(s)
@@ -488,21 +2659,14 @@ def get_object_details():
 def portf_del_asset():
     """ delete asset from portfolio and store in recorder """
     key = request.get_json()
-    portf = get_obj('portf')
-    if not isinstance(portf, eao.portfolio.Portfolio):
-        logging.error('no valid porftolio in recorder')
-        return portf, 400
-    assets = []
-    deleted = False
-    for a  in portf.assets:
-        if a.name == key: 
-            deleted = True
-        else:
-            assets.append(a)
-    portf = eao.portfolio.Portfolio(assets)
-    if deleted:
+    names = recorder('portf_asset_names')
+    if names is None:
+        s = 'portf not stored'
+        logging.error(s)
+        return s, 400
+    if key in names:
         logging.info('deleted asset '+key)
-        recorder(key = 'portf', in_data = eao.serialization.to_json(portf))
+        set_portf_assets({key: None})
         return 'done', 200
     else:
         logging.info('asset not found for deletion: '+key)
@@ -512,21 +2676,22 @@ def portf_del_asset():
 def portf_add_asset():
     """ add asset to portfolio and store in recorder """
     key = request.get_json()
-    portf = get_obj('portf')
-    if not isinstance(portf, eao.portfolio.Portfolio):
+    names = recorder('portf_asset_names')
+    if names is None:
         s = 'no valid porftolio in recorder'
         logging.error(s)
         return s, 400
-    assets = portf.assets
     a = eao.serialization.load_from_json(key)
     if not isinstance(a, eao.assets.Asset):
         s = 'no valid asset passed'
         logging.error(s)    
         return s, 400
-    assets.append(a)
-    portf = eao.portfolio.Portfolio(assets)
+    if a.name in names:
+        s = 'asset '+a.name+' already in portfolio. Asset names in portfolio must be unique'
+        logging.error(s)
+        return s, 400
+    set_portf_assets({a.name: a})
     logging.info('added asset '+a.name)
-    recorder(key = 'portf', in_data = eao.serialization.to_json(portf))
     return 'done', 200
 
 @app.route('/set_all_asset_parameters', methods=['PUT'])
@@ -543,29 +2708,27 @@ def set_all_asset_params():
         s = 'get asset details - requires asset name'
         logging.error(s)
         return s, 400
-    portf = get_obj('portf')
-    if not isinstance(portf, eao.portfolio.Portfolio):
-        logging.error('no valid porftolio in recorder')
-        return portf, 400
-    if not arg[0] in portf.asset_names:
+    names = recorder('portf_asset_names')
+    if names is None:
+        s = 'portf not stored'
+        logging.error(s)
+        return s, 400
+    if not arg[0] in names:
         s = 'get asset details -  asset name not in portfolio'
         logging.error(s)
         return s, 400
-    # get assets and change right asset
-    assets = portf.assets
-    idx = portf.asset_names.index(arg[0])
     # simple task, since we can pass on all parameters, creating the asset from scratch
     try:
-        assets[idx] = eao.serialization.load_from_json(json.dumps(arg[1]))
+        a = eao.serialization.load_from_json(json.dumps(arg[1]))
+        if not isinstance(a, eao.assets.Asset): raise ValueError('no asset')
     except:
         s = 'could not deserialize asset '+arg[0]
         logging.info(s)
         return s, 400
         
-    # save back in portfolio and store
-    portf = eao.portfolio.Portfolio(assets)
+    # save in portfolio (only this asset)
     try:
-        recorder(key = 'portf', in_data=eao.serialization.to_json(portf))
+        set_portf_assets({arg[0]: a})
     except:
         s = 'could not set parameter'
         logging.info(s)
@@ -576,7 +2739,111 @@ def set_all_asset_params():
     logging.info(s)
     return s, 200
 
-reset() ### delete global vars
+############## batch editing
+# a list of edit operations is applied in one request: all operations work on a copy of the
+# portfolio (asset names and changed assets) and std nodes. The result is validated and stored
+# once, only if all operations succeed (else nothing is changed)
+#  operation: [name, argument], argument as for the single endpoint with this name
+#  * set_asset_parameter       [asset name, parameter address, value]
+#  * set_all_asset_parameters  [asset name, parameter dict]
+#  * portf_add_asset           asset (JSON)
+#  * portf_delete_asset        asset name
+#  * add_std_node              node (JSON)
+#  * del_std_node              node name
+
+def batch_get_asset(state, name):
+    """ current asset in batch (changed or stored) """
+    if not name in state['names']: raise ValueError('asset name not in portfolio: '+str(name))
+    if not name in state['assets']: state['assets'][name] = recorder(asset_key(name), as_obj = True)
+    return state['assets'][name]
+
+def batch_put_asset(state, name, a):
+    """ replace asset in batch (name None: add) """
+    if not isinstance(a, eao.assets.Asset): raise ValueError('no valid asset passed')
+    if (a.name != name) and (a.name in state['names']):
+        raise ValueError('Asset names in portfolio must be unique')
+    if name is None: state['names'].append(a.name)
+    else:
+        state['names'][state['names'].index(name)] = a.name
+        state['assets'].pop(name, None)
+        state['changed'].discard(name)
+    state['assets'][a.name] = a
+    state['changed'].add(a.name)
+
+def batch_operation(state, op, arg):
+    """ apply one operation of batch to state. Returns info (str) """
+    if op in ('set_asset_parameter', 'set_all_asset_parameters', 'portf_add_asset', 'portf_delete_asset'):
+        if state['names'] is None: raise ValueError('portf not stored')
+    if op == 'set_asset_parameter':
+        batch_put_asset(state, arg[0], eao.io.set_param(batch_get_asset(state, arg[0]), arg[1], arg[2]))
+    elif op == 'set_all_asset_parameters':
+        batch_get_asset(state, arg[0])
+        batch_put_asset(state, arg[0], eao.serialization.load_from_json(json.dumps(arg[1])))
+    elif op == 'portf_add_asset':
+        batch_put_asset(state, None, eao.serialization.load_from_json(arg))
+    elif op == 'portf_delete_asset':
+        if not arg in state['names']: return 'asset not found, ignored'
+        state['names'].remove(arg)
+        state['assets'].pop(arg, None)
+        state['changed'].discard(arg)
+    elif op == 'add_std_node':
+        node = eao.serialization.load_from_json(arg)
+        if not isinstance(node, eao.basic_classes.Node): raise ValueError('no valid node given')
+        state['std_nodes'] = [node]+[n for n in state['std_nodes'] if n.name != node.name]
+    elif op == 'del_std_node':
+        if not arg in [n.name for n in state['std_nodes']]: return 'node not found for deletion: '+str(arg)
+        state['std_nodes'] = [n for n in state['std_nodes'] if n.name != arg]
+    else:
+        raise ValueError('unknown operation '+str(op))
+    return 'done'
+
+@app.route('/batch_edit', methods=['PUT'])
+def batch_edit():
+    """ apply list of edit operations to portfolio and std nodes at once (all or nothing)
+        arg  list of [operation name, argument] (see above)
+        returns 
+           status and list of status per operation (ok, failed, not applied) """
+    ops = request.get_json()
+    if not isinstance(ops, list):
+        s = 'batch edit requires list of operations [name, argument]'
+        logging.error(s)
+        return s, 400
+    names = recorder('portf_asset_names')
+    state = {'names': None if names is None else list(names), 'assets': {}, 'changed': set(),
+             'std_nodes': list(recorder('std_nodes', as_obj = True) or [])}
+    std_nodes = state['std_nodes']
+    out, failed = [], False
+    for i, op in enumerate(ops):
+        if failed:
+            out.append({'status': 'not applied'})
+            continue
+        try:
+            if not (isinstance(op, list) and (len(op) == 2)): raise ValueError('operation must be [name, argument]')
+            out.append({'status': 'ok', 'info': batch_operation(state, op[0], op[1])})
+        except Exception as e:
+            failed = True
+            out.append({'status': 'failed', 'error': str(e)})
+    if not failed:
+        try: # validate and store once
+            if state['names'] is not None:
+                eao.portfolio.Portfolio([batch_get_asset(state, n) for n in state['names']])
+        except Exception as e:
+            failed = True
+            out.append({'status': 'failed', 'error': 'no valid portfolio: '+str(e)})
+    if failed:
+        s = 'batch edit failed, nothing changed'
+        logging.error(s)
+        return {'status': 'failed', 'operations': out}, 400
+    if state['names'] is not None:
+        store_portf_assets(state['names'], {n: state['assets'][n] for n in state['changed']})
+    if state['std_nodes'] is not std_nodes:
+        recorder('std_nodes', obj = state['std_nodes'])
+    logging.info('batch edit with '+str(len(ops))+' operations')
+    return {'status': 'ok', 'operations': out}, 200
+
+if (not parameters['lazy_init']) and (multiprocessing.parent_process() is None): # not in worker processes
+    current_workspace() ### default workspace incl. std data (unless held by shared backend)
+    get_schema_registry()
 
 ############## specific: manage nodes
 # provide the functionality to refer to nodes by their names
@@ -587,26 +2854,54 @@ reset() ### delete global vars
 # asset.nodes = [node_name1, node_name2]
 #
 # here we replace the node_names from nodes from a given node list
+# Lookup is done in an index name -> Node of std nodes and portfolio nodes, cached per
+# workspace and rebuilt when std_nodes or portf_nodes change (add_std_node, del_std_node, set_portf)
 
-def fill_node_from_name(asset:eao.assets.Asset, nodes:list[eao.basic_classes.Node]):
-    """ set nodes in asset by node names"""
-    # get available node names
-    asset = copy.deepcopy(asset)
-    n_names = []
-    for n in nodes:
-        n_names.append(n.name)
-    for i,n in enumerate(asset.nodes):
+def node_index():
+    """ dict node name -> Node of std nodes and portfolio nodes (std nodes first, as in list) 
+        and dict for serialized nodes (JSON dicts, filled on demand). Do not manipulate """
+    ws = current_workspace()
+    versions = (data_version('std_nodes'), data_version('portf_nodes'))
+    if ('node_index' in ws) and (ws['node_index'][0] == versions):
+        return ws['node_index'][1], ws['node_index'][2]
+    index = {}
+    for key in ('std_nodes', 'portf_nodes'):
+        nodes = get_obj(key)
+        if isinstance(nodes, dict): nodes = list(nodes.values()) # portfolio nodes by name
+        if isinstance(nodes, list):
+            for n in nodes: index.setdefault(n.name, n)
+    ws['node_index'] = (versions, index, {})
+    return index, ws['node_index'][2]
+
+def fill_node_json_from_name(asset:dict):
+    """ set nodes in asset given as JSON dict by node names (in place). As assets with node names 
+        cannot be deserialized, names are replaced by serialized nodes before """
+    index, index_json = node_index()
+    nodes = asset.get('nodes')
+    if nodes is None: return asset
+    single = not isinstance(nodes, list)
+    if single: nodes = [nodes]
+    for i, n in enumerate(nodes):
         if isinstance(n, str):
-            try:
-                idx = n_names.index(n)
-            except:
-                s = 'name of node not found'
-                raise ValueError(s)
-            asset.nodes[i] = nodes[idx]
-        elif isinstance(n, eao.basic_classes.Node): pass
-        else: raise ValueError('not a valid node')
+            if not n in index: raise ValueError('name of node not found: '+n)
+            if not n in index_json:
+                index_json[n] = json.loads(eao.serialization.to_json(index[n]))
+            nodes[i] = index_json[n]
+    asset['nodes'] = nodes[0] if single else nodes
     return asset
 
+def load_asset_with_node_names(arg):
+    """ asset from JSON (string or dict) with node names replaced by nodes. returns asset and error message """
+    try:
+        asset = json.loads(arg) if isinstance(arg, str) else arg
+        fill_node_json_from_name(asset)
+        a = eao.serialization.load_from_json(json.dumps(asset))
+    except Exception as e:
+        return None, 'no valid asset passed: '+str(e)
+    if not isinstance(a, eao.assets.Asset):
+        return None, 'no valid asset passed'
+    return a, None
+
 @app.route('/set_nodes_from_list', methods=['PUT'])
 def set_nodes_from_list():
     """ set all parameters of an asset (directly in the portfolio)
@@ -617,24 +2912,37 @@ def set_nodes_from_list():
         returns 
            asset with replaced nodes taken from protf nodes and std nodes """
     arg = request.get_json()  # no
-    a = eao.serialization.load_from_json(arg)
-    if not isinstance(a, eao.assets.Asset):
-        s = 'no valid asset passed'
+    a, s = load_asset_with_node_names(arg)
+    if s is not None:
         logging.error(s)    
         return s, 400
-    # get all available nodes
-    std_nodes = eao.serialization.load_from_json(recorder(key = 'std_nodes'))    
-    if not isinstance(std_nodes, list): 
-        std_nodes = []
-    portf_nodes = eao.serialization.load_from_json(recorder(key = 'portf_nodes'))    
-    if not isinstance(portf_nodes, list): 
-        portf_nodes = []
-    nodes = std_nodes+portf_nodes
-
-    # replace names with nodes
-    a = fill_node_from_name(a, nodes)
     return eao.serialization.to_json(a), 200
 
+@app.route('/set_nodes_from_list_bulk', methods=['PUT'])
+def set_nodes_from_list_bulk():
+    """ replace node names by nodes (from portf nodes and std nodes) for a list of assets in one call
+        args:
+           list of assets (JSON string of list or list of asset JSONs)
+        returns 
+           list of assets (JSON) with replaced nodes """
+    arg = request.get_json()
+    try:
+        assets = json.loads(arg) if isinstance(arg, str) else arg
+        if not isinstance(assets, list): raise ValueError('list expected')
+    except Exception as e:
+        s = 'no valid list of assets: '+str(e)
+        logging.error(s)
+        return s, 400
+    out = []
+    for i, asset in enumerate(assets):
+        a, s = load_asset_with_node_names(asset)
+        if s is not None:
+            s = 'asset '+str(i)+': '+s
+            logging.error(s)
+            return s, 400
+        out.append(a)
+    return eao.serialization.to_json(out), 200
+
 ############## get network for portfolio
 
 ### get encoded info
@@ -643,26 +2951,103 @@ def get_network():
     """ get network info for portfolio
         returns 
            encoded networkx output for portfolio: nodes, edges, labels, ... """
+    if data_version('portf') > 0:
+        return etag_response(data_etag('portf'), network)
+    return network()
+
+def network_graph(portf):
+    """ networkx graph of portfolio: nodes, transport assets as edges, other assets as
+        further nodes attached to their nodes (as in eao.network_graphs.create_graph) """
+    G = nx.DiGraph()
+    for n in portf.nodes:
+        G.add_node(n)
+    transports = (eao.assets.Transport, eao.assets.ExtendedTransport)
+    for a in portf.assets:
+        if isinstance(a, transports):
+            G.add_edge(a.nodes[0].name, a.nodes[1].name, label = a.name)
+    for a in portf.assets:
+        if not isinstance(a, transports):
+            G.add_node(a.name)
+            for n in a.nodes:
+                G.add_edge(a.name, n.name, label = '')
+                G.add_edge(n.name, a.name, label = '')
+    return G
+
+def network():
+    """ network info for stored portfolio (see /get_network). Cached per portfolio version.
+        After edits, positions of the previous layout are the seed for the new layout 
+        (unchanged graph: positions reused) """
+    ws = current_workspace()
+    version = data_version('portf')
+    cached  = ws.get('network')
+    if (cached is not None) and (cached['version'] == version):
+        return Response(cached['body'], mimetype = 'application/json')
     try:
-        portf   = eao.serialization.load_from_json(recorder('portf'))
-        res = eao.network_graphs.create_graph(portf=portf, no_image_output=True)
-        # positions or other elements may be given as arrays - make lists to make them serializable
-        for k in res:
-            if isinstance(res[k], dict):
-                for kk in res[k]:
-                    if isinstance(res[k][kk], np.ndarray): res[k][kk] = list(res[k][kk])
-            if isinstance(res[k], list):
-                for ii, kk in enumerate(res[k]):
-                    if isinstance(kk, np.ndarray): res[k][ii] = list(kk)
-                
+        portf = recorder('portf', as_obj = True)
+        G     = network_graph(portf)
+        res   = nx.node_link_data(G)
+        structure = (res['nodes'], res['links'])
+        if (cached is not None) and (cached['structure'] == structure):
+            pos = cached['pos']
+        else:
+            seed = {} if cached is None else {n: cached['pos'][n] for n in G if n in cached['pos']}
+            if len(seed) > 0:
+                pos = nx.spring_layout(G, pos = seed, iterations = parameters['network_seeded_iterations'], seed = 0)
+            else:
+                pos = nx.spring_layout(G, seed = 0)
+        # vectorized conversion of positions to lists
+        names = list(pos)
+        res['position'] = dict(zip(names, np.asarray([pos[n] for n in names]).tolist()))
+        body = json.dumps(res)
     except:
         s = "could not create portfolio's network chart"
         logging.error(s)
         return s, 400
-    return res, 200
+    ws['network'] = {'version': version, 'body': body, 'pos': pos, 'structure': structure}
+    return Response(body, mimetype = 'application/json')
+
+
+############## warm up and readiness
+# the first optimization in a process is slow (solver backends and cvxpy / pandas code paths
+# are loaded on first use). Warm up solves a tiny portfolio of std assets with the configured
+# solver. /ready reports ready only when warm up is done (or not configured)
+warm_up_status = {'status': 'not started'}
+
+def warm_up():
+    """ solve tiny portfolio (std_contract and battery from std assets, one day hourly) """
+    warm_up_status['status'] = 'running'
+    t0 = time.perf_counter()
+    try:
+        assets = eao.serialization.load_from_json(file_name=parameters['file_assets'])
+        portf  = eao.portfolio.Portfolio([a for a in assets if a.name in ('std_contract', 'battery')])
+        tg     = eao.assets.Timegrid(dt.datetime(2024,1,1), dt.datetime(2024,1,2), freq = 'h')
+        res, code = solve(portf, tg, {'price_tag': np.sin(np.arange(tg.T))}, solver = parameters['solver'])
+        if code != 200: raise ValueError(res)
+        results_to_json(res)
+        warm_up_status['status'] = 'done'
+    except Exception as e:
+        warm_up_status['status'] = 'failed'
+        warm_up_status['error']  = str(e)
+        logging.error('warm up failed: '+str(e))
+    startup_timing['warm up'] = time.perf_counter() - t0
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """ readiness (e.g. for load balancers): 200 if ready, 503 while warming up or if warm up failed """
+    if (not parameters['warm_up']) or (warm_up_status['status'] == 'done'):
+        return 'ready', 200
+    return warm_up_status, 503
 
+startup_timing['import eao_server'] = time.perf_counter() - startup_t0
+logging.info('startup timing (s): '+json.dumps(startup_timing))
+if parameters['warm_up'] and (multiprocessing.parent_process() is None):
+    threading.Thread(target = warm_up, name = 'eao_warm_up', daemon = True).start()
 
-def create_app():
+def create_app(recorder_backend = None, recorder_path = None):
+    """ app for WSGI servers. Several worker processes require a shared recorder backend, e.g.
+        gunicorn -w 4 'eao_server:create_app(recorder_backend="sqlite")' """
+    if recorder_backend is not None:
+        set_recorder_backend(recorder_backend, recorder_path)
     return app
 
 #######################################################
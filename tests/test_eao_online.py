@@ -4,6 +4,13 @@ import json
 import eaopack as eao
 import numpy as np
 import datetime as dt
+import time
+import io
+import os
+import subprocess
+import tempfile
+import shutil
+import itertools
 
 from os.path import dirname, join
 import sys
@@ -11,6 +18,7 @@ mypath = (dirname(__file__))
 sys.path.append(join(mypath, '..'))
 
 from eao_server import create_app
+import eao_server
 
 ######################### dummy data ##################################################
 node1 = eao.assets.Node('portf_node_1')
@@ -37,6 +45,7 @@ portf = eao.portfolio.Portfolio([a1, a2, a3, a5])
 op = portf.setup_optim_problem(prices = prices, timegrid = timegrid)
 res = op.optimize()
 out = eao.io.extract_output(portf, op, res)
+portf_json = eao.serialization.to_json(portf) # before test_run_through manipulates assets
 pass
 ###################################################################### end dummy data
 
@@ -69,6 +78,843 @@ class TestBasic(flask_unittest.ClientTestCase):
         assert r.status_code == 200
         assert obj_net_data['nodes'][0]['id'] == 'portf_node_1'
         
+    def test_object_cache(self, client):
+        ### deserialized objects are cached in recorder when storing
+        r = client.put('http://127.0.0.1:5000/set_portf', json=portf_json)
+        assert r.status_code == 200
+        obj = eao_server.recorder('portf', as_obj = True)
+        assert isinstance(obj, eao.portfolio.Portfolio)
+        assert obj is eao_server.get_obj('portf')
+        assert eao_server.get_obj('portf_assets') is obj.assets
+        ### invalidated when changed
+        r = client.put('http://127.0.0.1:5000/portf_delete_asset', json = 'storage')
+        assert r.status_code == 200
+        new_obj = eao_server.get_obj('portf')
+        assert new_obj is not obj
+        assert 'storage' not in new_obj.asset_names
+        assert 'storage' in obj.asset_names  # cached object not manipulated
+        assert eao_server.recorder('portf_asset_names') == new_obj.asset_names
+        ### problems are set up on copies -- eao changes portfolio, assets and timegrid when setting up
+        self.set_data(client)
+        cached = [eao_server.get_obj('portf'), eao_server.get_obj('timegrid')]
+        cached += cached[0].assets
+        setup = eao.portfolio.Portfolio.setup_optim_problem
+        used = []
+        def check_setup(self, *args, **kwargs):
+            used.extend([self, kwargs.get('timegrid')] + self.assets)
+            return setup(self, *args, **kwargs)
+        eao.portfolio.Portfolio.setup_optim_problem = check_setup
+        try:
+            for url in ('/estimate_problem', '/optimize', '/optimize?window=10'):
+                r = client.get('http://127.0.0.1:5000'+url)
+                assert r.status_code == 200
+        finally:
+            eao.portfolio.Portfolio.setup_optim_problem = setup
+        assert len(used) > 0
+        assert not any(u is c for u in used for c in cached)
+
+    def set_data(self, client):
+        """ store test portfolio, timegrid and prices on server """
+        r = client.get('http://127.0.0.1:5000/reset')
+        r = client.put('http://127.0.0.1:5000/set_portf', json=portf_json)
+        assert r.status_code == 200
+        r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid))
+        assert r.status_code == 200
+        r = client.put('http://127.0.0.1:5000/set_time_series_data', json=eao.serialization.to_json(prices))
+        assert r.status_code == 200
+
+    def test_jobs(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert r.status_code == 200
+        value = json.loads(r.text)['total value']
+        ### submit and poll
+        r = client.get('http://127.0.0.1:5000/optimize_submit')
+        assert r.status_code == 200
+        job_id = json.loads(r.text)
+        for i in range(600):
+            r = client.put('http://127.0.0.1:5000/job_status', json = job_id)
+            assert r.status_code == 200
+            if json.loads(r.text)['status'] in ('done', 'failed'): break
+            time.sleep(0.1)
+        r = client.put('http://127.0.0.1:5000/job_result', json = job_id)
+        assert r.status_code == 200
+        self.assertAlmostEqual(json.loads(r.text)['total value'], value, 4)
+        r = client.get('http://127.0.0.1:5000/get_jobs')
+        assert job_id in [j['job_id'] for j in json.loads(r.text)]
+        ### cancelling finished job has no effect
+        r = client.put('http://127.0.0.1:5000/job_cancel', json = job_id)
+        assert r.status_code == 200
+        r = client.put('http://127.0.0.1:5000/job_status', json = job_id)
+        assert json.loads(r.text)['status'] == 'done'
+        r = client.put('http://127.0.0.1:5000/job_status', json = 'no_job')
+        assert r.status_code == 400
+        ### job snapshot (cached objects) is not set up in place
+        cached = [eao_server.get_obj('portf'), eao_server.get_obj('timegrid')]
+        setup = eao.portfolio.Portfolio.setup_optim_problem
+        used = []
+        def check_setup(self, *args, **kwargs):
+            used.extend([self, kwargs.get('timegrid')])
+            return setup(self, *args, **kwargs)
+        eao.portfolio.Portfolio.setup_optim_problem = check_setup
+        try:
+            r = client.get('http://127.0.0.1:5000/flush_result_cache')
+            job_id = json.loads(client.get('http://127.0.0.1:5000/optimize_submit').text)
+            for i in range(600):
+                if json.loads(client.put('http://127.0.0.1:5000/job_status', json = job_id).text)['status'] in ('done', 'failed'): break
+                time.sleep(0.1)
+        finally:
+            eao.portfolio.Portfolio.setup_optim_problem = setup
+        assert json.loads(client.put('http://127.0.0.1:5000/job_status', json = job_id).text)['status'] == 'done'
+        assert len(used) > 0
+        assert not any(u is c for u in used for c in cached)
+
+    def test_scenarios(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        value = json.loads(r.text)['total value']
+        scen = {'base': eao.serialization.to_json(prices),
+                'high': {k: list(prices[k]+10.) for k in prices}}
+        r = client.put('http://127.0.0.1:5000/optimize_scenarios', json = scen)
+        assert r.status_code == 200
+        res = json.loads(r.text)
+        self.assertAlmostEqual(res['base']['total value'], value, 4)
+        assert 'SC_1 (portf_node_1)' in res['high']
+        assert len(res['high']['time_index']) == timegrid.T
+        ### pool kept (not forked from server), new portfolio picked up by workers
+        pool = eao_server.get_scenario_pool()
+        assert pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+        r = client.put('http://127.0.0.1:5000/set_portf', json = eao.serialization.to_json(eao.portfolio.Portfolio([a2, a3])))
+        r = client.put('http://127.0.0.1:5000/optimize_scenarios', json = scen)
+        assert r.status_code == 200
+        assert 'SC_1 (portf_node_1)' not in json.loads(r.text)['high']
+        assert eao_server.get_scenario_pool() is pool
+        ### worker sets up problem once per inputs, then only refreshes costs
+        inputs = ('test_key', portf_json, eao.serialization.to_json(timegrid), 'standard', {})
+        stats = dict(eao_server.problem_cache_stats)
+        _, res_base, code = eao_server.solve_scenario(inputs, 'base', prices)
+        _, res_high, code = eao_server.solve_scenario(inputs, 'high', {k: prices[k]+10. for k in prices})
+        assert code == 200
+        assert eao_server.problem_cache_stats['built']  == stats['built']+1
+        assert eao_server.problem_cache_stats['reused'] == stats['reused']+1
+        self.assertAlmostEqual(res_base['total value'], value, 4)
+        self.assertAlmostEqual(res_high['total value'], res['high']['total value'], 4)
+
+    def test_result_cache(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/flush_result_cache')
+        assert r.status_code == 200
+        r = client.get('http://127.0.0.1:5000/get_result_cache_info')
+        info = json.loads(r.text)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        res1 = json.loads(r.text)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert json.loads(r.text) == res1
+        r = client.get('http://127.0.0.1:5000/get_result_cache_info')
+        info2 = json.loads(r.text)
+        assert info2['hits']   == info['hits']+1
+        assert info2['misses'] == info['misses']+1
+        assert info2['entries'] == 1
+        ### new input data -- new key
+        r = client.put('http://127.0.0.1:5000/set_time_series_data', json={k: list(prices[k]+1.) for k in prices})
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert json.loads(r.text)['total value'] != res1['total value']
+        r = client.get('http://127.0.0.1:5000/get_result_cache_info')
+        assert json.loads(r.text)['entries'] == 2
+
+    def test_binary_time_series(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        value = json.loads(r.text)['total value']
+        ### npz
+        buf = io.BytesIO()
+        np.savez(buf, **prices)
+        r = client.put('http://127.0.0.1:5000/set_time_series_data', data = buf.getvalue(), content_type = 'application/x-npz')
+        assert r.status_code == 200
+        r = client.get('http://127.0.0.1:5000/optimize')
+        self.assertAlmostEqual(json.loads(r.text)['total value'], value, 4)
+        ### raw float64 with header
+        names = json.dumps(list(prices)).encode()
+        body = np.uint32(len(names)).tobytes() + names + np.concatenate(list(prices.values())).astype('<f8').tobytes()
+        r = client.put('http://127.0.0.1:5000/set_time_series_data', data = body, content_type = 'application/octet-stream')
+        assert r.status_code == 200
+        ts = eao_server.get_obj('time_series_data')
+        assert np.allclose(ts['rand_price_2'], prices['rand_price_2'])
+        r = client.get('http://127.0.0.1:5000/optimize_submit')
+        assert r.status_code == 200
+        job_id = json.loads(r.text)
+        for i in range(600):
+            if json.loads(client.put('http://127.0.0.1:5000/job_status', json = job_id).text)['status'] in ('done', 'failed'): break
+            time.sleep(0.1)
+        r = client.put('http://127.0.0.1:5000/job_result', json = job_id)
+        self.assertAlmostEqual(json.loads(r.text)['total value'], value, 4)
+        jsons = eao_server.current_workspace()['jsons'] # no JSON by access or job submission
+        assert jsons.get('time_series_data', (0,))[0] != eao_server.data_version('time_series_data')
+        ### JSON only created on request
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'time_series_data')
+        assert r.status_code == 200
+        ts = eao.serialization.load_from_json(json.loads(r.text))
+        assert np.allclose(ts['rand_price_1'], prices['rand_price_1'])
+        ### npy with names
+        buf = io.BytesIO()
+        np.save(buf, np.vstack(list(prices.values())))
+        r = client.put('http://127.0.0.1:5000/set_time_series_data?names='+','.join(prices), data = buf.getvalue(), content_type = 'application/x-npy')
+        assert r.status_code == 200
+        r = client.put('http://127.0.0.1:5000/set_time_series_data', data = b'123', content_type = 'application/octet-stream')
+        assert r.status_code == 400
+
+    def test_results_formats(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        res = json.loads(r.text)
+        ### epoch time index
+        r = client.get('http://127.0.0.1:5000/optimize?time_index=epoch')
+        res_e = json.loads(r.text)
+        assert res_e['time_index'][0] == dt.datetime(2021,1,1, tzinfo = dt.timezone.utc).timestamp()
+        assert res_e['SC_2 (portf_node_1)'] == res['SC_2 (portf_node_1)']
+        ### npz by Accept header
+        r = client.get('http://127.0.0.1:5000/optimize', headers = {'Accept': 'application/x-npz'})
+        assert r.status_code == 200
+        assert r.mimetype == 'application/x-npz'
+        f = np.load(io.BytesIO(r.data))
+        assert np.allclose(f['SC_2 (portf_node_1)'], res['SC_2 (portf_node_1)'])
+        self.assertAlmostEqual(float(f['total_value']), res['total value'])
+        ### csv by query parameter
+        r = client.get('http://127.0.0.1:5000/optimize?format=csv')
+        assert r.status_code == 200
+        lines = r.text.splitlines()
+        assert lines[0].startswith('time_index,')
+        assert len(lines) == timegrid.T+1
+        self.assertAlmostEqual(float(r.headers['X-Total-Value']), res['total value'])
+        # streamed in row chunks -- same as CSV of full DataFrame
+        chunk_size = eao_server.parameters['stream_chunk_size']
+        eao_server.parameters['stream_chunk_size'] = 100
+        try:
+            r2 = client.get('http://127.0.0.1:5000/optimize?format=csv')
+            assert r2.is_streamed
+            assert r2.data == r.data
+        finally:
+            eao_server.parameters['stream_chunk_size'] = chunk_size
+        r = client.get('http://127.0.0.1:5000/optimize?format=xls')
+        assert r.status_code == 400
+
+    def test_patch_time_series(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        value = json.loads(r.text)['total value']
+        ts_before = eao_server.get_obj('time_series_data')['rand_price_1'].copy()
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'time_series_data') # JSON created
+        v0 = eao_server.data_version('time_series_data')
+        held = eao_server.get_obj('time_series_data') # e.g. by running optimization
+        ### slice
+        r = client.patch('http://127.0.0.1:5000/patch_time_series_data', json = {'name': 'rand_price_1', 'values': [100., 101.], 't0': 10})
+        assert r.status_code == 200
+        assert json.loads(r.text) > v0
+        ts = eao_server.get_obj('time_series_data')
+        assert held['rand_price_1'] is not ts['rand_price_1'] # shared object not changed
+        assert np.all(held['rand_price_1'] == ts_before)
+        jsons = eao_server.current_workspace()['jsons'] # no JSON built on patch and access
+        assert jsons.get('time_series_data', (0,))[0] != eao_server.data_version('time_series_data')
+        assert ts['rand_price_1'][10] == 100. and ts['rand_price_1'][11] == 101.
+        assert np.all(ts['rand_price_1'][12:] == ts_before[12:])
+        # JSON updated as well
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'time_series_data')
+        assert eao.serialization.load_from_json(json.loads(r.text))['rand_price_1'][10] == 100.
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert json.loads(r.text)['total value'] != value
+        ### append & new series
+        r = client.patch('http://127.0.0.1:5000/patch_time_series_data', json = [{'name': 'rand_price_1', 'values': [1., 2.], 'append': True},
+                                                                                 {'name': 'new', 'values': [3., 4.]}])
+        assert r.status_code == 200
+        ts = eao_server.get_obj('time_series_data')
+        assert len(ts['rand_price_1']) == timegrid.T + 2
+        assert list(ts['new']) == [3., 4.]
+        ### invalid slice - nothing changed
+        v = eao_server.data_version('time_series_data')
+        r = client.patch('http://127.0.0.1:5000/patch_time_series_data', json = [{'name': 'new', 'values': [5.], 't0': 0},
+                                                                                 {'name': 'new', 'values': [1., 2.], 't0': 5}])
+        assert r.status_code == 400
+        assert list(eao_server.get_obj('time_series_data')['new']) == [3., 4.]
+        assert eao_server.data_version('time_series_data') == v
+
+    def test_rolling_horizon(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/optimize')
+        full = json.loads(r.text)
+        r = client.get('http://127.0.0.1:5000/optimize?window=10&overlap=3')
+        assert r.status_code == 200
+        res = json.loads(r.text)
+        assert res['time_index'] == full['time_index']
+        assert res['total value'] <= full['total value'] + 1e-4
+        # storage levels carried over: start level = end level
+        self.assertAlmostEqual(sum(res['storage (portf_node_1)']), 0., 4)
+        # window covering whole timegrid - same as standard
+        r = client.get('http://127.0.0.1:5000/optimize?window=100')
+        self.assertAlmostEqual(json.loads(r.text)['total value'], full['total value'], 4)
+        r = client.get('http://127.0.0.1:5000/optimize?window=10&overlap=10')
+        assert r.status_code == 400
+
+    def test_problem_reuse(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/flush_result_cache')
+        r = client.get('http://127.0.0.1:5000/optimize')
+        stats = dict(eao_server.problem_cache_stats)
+        ### only prices change - problem is reused
+        new_prices = {k: prices[k]*2.+1. for k in prices}
+        r = client.put('http://127.0.0.1:5000/set_time_series_data', json={k: list(new_prices[k]) for k in new_prices})
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert r.status_code == 200
+        assert eao_server.problem_cache_stats['reused'] == stats['reused']+1
+        assert eao_server.problem_cache_stats['built']  == stats['built']
+        # same result as problem set up from scratch
+        op = portf.setup_optim_problem(prices = new_prices, timegrid = timegrid)
+        self.assertAlmostEqual(json.loads(r.text)['total value'], op.optimize().value, 4)
+        ### new timegrid - problem set up again
+        r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid))
+        r = client.get('http://127.0.0.1:5000/flush_result_cache')
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert eao_server.problem_cache_stats['built'] == stats['built']+1
+        ### problems are set up without holding the cache lock (other workspaces not blocked)
+        setup = eao.portfolio.Portfolio.setup_optim_problem
+        locked = []
+        def check_setup(self, *args, **kwargs):
+            locked.append(eao_server.problem_cache_lock.locked())
+            return setup(self, *args, **kwargs)
+        eao.portfolio.Portfolio.setup_optim_problem = check_setup
+        try:
+            r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid))
+            r = client.get('http://127.0.0.1:5000/flush_result_cache')
+            r = client.get('http://127.0.0.1:5000/optimize')
+        finally:
+            eao.portfolio.Portfolio.setup_optim_problem = setup
+        assert r.status_code == 200
+        assert (len(locked) > 0) and not any(locked)
+
+    def test_workspaces(self, client):
+        self.set_data(client)
+        ### new workspace by header - separate data, std data loaded
+        r = client.get('http://127.0.0.1:5000/get_data_keys', headers = {'X-Workspace': 'user_1'})
+        keys = json.loads(r.text)
+        assert 'std_nodes' in keys
+        assert not 'portf' in keys
+        r = client.put('http://127.0.0.1:5000/set_portf', json = portf_json, headers = {'X-Workspace': 'user_1'})
+        assert r.status_code == 200
+        r = client.put('http://127.0.0.1:5000/portf_delete_asset', json = 'storage', headers = {'X-Workspace': 'user_1'})
+        ### same workspace by URL prefix
+        r = client.put('http://127.0.0.1:5000/ws/user_1/get_data', json = 'portf_asset_names')
+        assert 'storage' not in json.loads(r.text)
+        # default workspace not affected
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'portf_asset_names')
+        assert 'storage' in json.loads(r.text)
+        ### reset only affects own workspace
+        r = client.get('http://127.0.0.1:5000/ws/user_1/reset')
+        r = client.get('http://127.0.0.1:5000/get_data_keys')
+        assert 'portf' in json.loads(r.text)
+        r = client.get('http://127.0.0.1:5000/get_workspaces')
+        assert 'user_1' in json.loads(r.text)
+        r = client.get('http://127.0.0.1:5000/ws/user_1/delete_workspace')
+        assert r.status_code == 200
+        r = client.get('http://127.0.0.1:5000/get_workspaces')
+        assert 'user_1' not in json.loads(r.text)
+        assert 'user_1' not in eao_server.get_backend().locks # no lock kept for deleted workspace
+        r = client.get('http://127.0.0.1:5000/get_data_keys', headers = {'X-Workspace': 'no/valid'})
+        assert r.status_code == 400
+
+    def test_sqlite_backend(self, client):
+        tmp_dir = tempfile.mkdtemp()
+        file_name = join(tmp_dir, 'recorder.sqlite')
+        try:
+            eao_server.set_recorder_backend('sqlite', file_name)
+            self.set_data(client)
+            r = client.get('http://127.0.0.1:5000/optimize')
+            value = json.loads(r.text)['total value']
+            r = client.get('http://127.0.0.1:5000/optimize_submit')
+            job_id = json.loads(r.text)
+            # another server process sees data and jobs
+            code = 'import eao_server, json; print(json.dumps(eao_server.recorder("portf_asset_names")))'
+            env = dict(os.environ, EAO_RECORDER_BACKEND = 'sqlite', EAO_RECORDER_FILE = file_name)
+            out = subprocess.run([sys.executable, '-c', code], env = env, cwd = join(mypath, '..'),
+                                 capture_output = True, text = True, check = True).stdout
+            assert json.loads(out.splitlines()[-1]) == ['SC_1', 'SC_2', 'SC_3', 'storage']
+            for i in range(600):
+                r = client.put('http://127.0.0.1:5000/job_status', json = job_id)
+                if json.loads(r.text)['status'] in ('done', 'failed'): break
+                time.sleep(0.1)
+            r = client.put('http://127.0.0.1:5000/job_result', json = job_id)
+            self.assertAlmostEqual(json.loads(r.text)['total value'], value, 4)
+            # binary upload stored as arrays
+            buffer = io.BytesIO()
+            np.savez(buffer, **prices)
+            r = client.put('http://127.0.0.1:5000/set_time_series_data', data = buffer.getvalue(),
+                           content_type = 'application/x-npz')
+            assert r.status_code == 200
+            eao_server.workspaces.clear() # drop local caches, as in a new process
+            ts = eao_server.get_obj('time_series_data')
+            assert np.allclose(ts['rand_price_1'], prices['rand_price_1'])
+            ### jobs of ended server process: queued jobs taken over, running jobs failed
+            code = """
+import eao_server, json, os, threading
+ex, ev = eao_server.get_job_executor(), threading.Event()
+for i in range(eao_server.parameters['n_job_workers']): ex.submit(ev.wait) # workers busy - jobs stay queued
+c = eao_server.create_app().test_client()
+print(json.dumps([json.loads(c.get('/optimize_submit').text) for i in range(2)]), flush = True)
+os._exit(0)
+"""
+            out = subprocess.run([sys.executable, '-c', code], env = env, cwd = join(mypath, '..'),
+                                 capture_output = True, text = True, check = True).stdout
+            queued, running = json.loads(out.strip().splitlines()[-1])
+            assert eao_server.backend.get_job_input(queued) is not None
+            def start(job):
+                job['status'] = 'running'
+                return True
+            eao_server.backend.update_job(running, start)
+            eao_server.last_job_recovery = 0.
+            for i in range(600):
+                r = client.put('http://127.0.0.1:5000/job_status', json = queued)
+                if json.loads(r.text)['status'] in ('done', 'failed'): break
+                time.sleep(0.1)
+            r = client.put('http://127.0.0.1:5000/job_result', json = queued)
+            self.assertAlmostEqual(json.loads(r.text)['total value'], value, 4)
+            assert eao_server.backend.get_job_input(queued) is None # dropped when finished
+            r = client.put('http://127.0.0.1:5000/job_status', json = running)
+            assert json.loads(r.text)['status'] == 'failed'
+            r = client.get('http://127.0.0.1:5000/get_data_keys', headers = {'X-Workspace': 'other'})
+            assert 'std_nodes' in json.loads(r.text)
+            r = client.get('http://127.0.0.1:5000/get_workspaces')
+            assert 'other' in json.loads(r.text)
+        finally:
+            eao_server.set_recorder_backend('memory')
+            shutil.rmtree(tmp_dir, ignore_errors = True)
+
+    def test_file_backend(self, client):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            eao_server.set_recorder_backend('files', tmp_dir)
+            self.set_data(client)
+            r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid), headers = {'X-Workspace': 'alice'})
+            buffer = io.BytesIO()
+            np.savez(buffer, **prices)
+            r = client.put('http://127.0.0.1:5000/set_time_series_data', data = buffer.getvalue(),
+                           content_type = 'application/x-npz')
+            assert r.status_code == 200
+            r = client.get('http://127.0.0.1:5000/optimize')
+            value = json.loads(r.text)['total value']
+            versions = {k: eao_server.data_version(k) for k in ('portf', 'timegrid', 'time_series_data')}
+            etag = client.put('http://127.0.0.1:5000/get_data', json = 'timegrid').headers['ETag']
+            os.utime(join(tmp_dir, 'alice'), (0, 0)) # written long ago
+            # interrupted write leaves temp file only
+            open(join(tmp_dir, 'default', 'portf.999999.str.z.tmp'), 'wb').close()
+            ### restart: data loaded on first access
+            eao_server.set_recorder_backend('files', tmp_dir)
+            assert isinstance(eao_server.backend.data['default']['portf'][0], eao_server.StoredBlob)
+            assert {k: eao_server.data_version(k) for k in versions} == versions
+            eao_server.last_eviction = 0.
+            eao_server.evict_workspaces() # restored workspaces are not idle
+            assert os.path.isdir(join(tmp_dir, 'alice')) and ('alice' in eao_server.backend.workspaces())
+            eao_server.backend.access['alice'] = 0. # idle
+            eao_server.last_eviction = 0.
+            eao_server.evict_workspaces()
+            assert not os.path.isdir(join(tmp_dir, 'alice'))
+            r = client.put('http://127.0.0.1:5000/get_data', json = 'timegrid', headers = {'If-None-Match': etag})
+            assert r.status_code == 304 # epoch kept with data
+            r = client.get('http://127.0.0.1:5000/flush_result_cache')
+            r = client.get('http://127.0.0.1:5000/optimize')
+            self.assertAlmostEqual(json.loads(r.text)['total value'], value, 4)
+            assert not isinstance(eao_server.backend.data['default']['portf'][0], eao_server.StoredBlob)
+            assert not os.path.exists(join(tmp_dir, 'default', 'portf.999999.str.z.tmp'))
+            ### one file per key
+            r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid))
+            assert len([f for f in os.listdir(join(tmp_dir, 'default')) if f.startswith('timegrid.')]) == 1
+            assert eao_server.data_version('timegrid') > versions['timegrid']
+            ### failed write: stored version unchanged
+            v = eao_server.data_version('timegrid')
+            def fail(directory): raise OSError('disk full')
+            fsync_dir, eao_server.fsync_dir = eao_server.fsync_dir, fail
+            try:
+                self.assertRaises(OSError, eao_server.backend.put, 'default', 'timegrid', 'x')
+            finally:
+                eao_server.fsync_dir = fsync_dir
+            assert eao_server.backend.version('default', 'timegrid') == v
+            assert len([f for f in os.listdir(join(tmp_dir, 'default')) if f.startswith('timegrid.')]) == 1
+        finally:
+            eao_server.set_recorder_backend('memory')
+            shutil.rmtree(tmp_dir, ignore_errors = True)
+
+    def test_lazy_init(self, client):
+        r = client.get('http://127.0.0.1:5000/get_startup_timing')
+        assert r.status_code == 200
+        assert 'import eao_server' in json.loads(r.text)
+        ### lazy mode: heavy packages imported on first use
+        code = """
+import sys, json, eao_server
+assert not 'eaopack' in sys.modules
+c = eao_server.create_app().test_client()
+assert 'std_nodes' in json.loads(c.get('/get_data_keys').text)
+assert not 'eaopack' in sys.modules
+nodes = eao_server.get_obj('std_nodes')
+assert 'eaopack' in sys.modules
+print(json.dumps([n.name for n in nodes]))
+print(c.get('/get_startup_timing').text)
+"""
+        env = dict(os.environ, EAO_LAZY_INIT = '1')
+        out = subprocess.run([sys.executable, '-c', code], env = env, cwd = join(mypath, '..'),
+                             capture_output = True, text = True, check = True).stdout.strip().splitlines()
+        assert 'node_power' in json.loads(out[-2])
+        timing = json.loads(out[-1])
+        assert timing['lazy_init'] and ('import eaopack' in timing)
+
+    def test_warm_up(self, client):
+        r = client.get('http://127.0.0.1:5000/ready')
+        assert r.status_code == 200 # no warm up configured
+        eao_server.parameters['warm_up'] = True
+        try:
+            eao_server.warm_up_status['status'] = 'not started'
+            r = client.get('http://127.0.0.1:5000/ready')
+            assert r.status_code == 503
+            eao_server.warm_up()
+            assert eao_server.warm_up_status['status'] == 'done'
+            r = client.get('http://127.0.0.1:5000/ready')
+            assert r.status_code == 200
+            assert 'warm up' in eao_server.startup_timing
+        finally:
+            eao_server.parameters['warm_up'] = False
+
+    def test_std_snapshot(self, client):
+        r = client.get('http://127.0.0.1:5000/reset')
+        nodes = eao_server.get_obj('std_nodes')
+        r = client.get('http://127.0.0.1:5000/reset')
+        assert eao_server.get_obj('std_nodes') is nodes # restored by reference
+        r = client.get('http://127.0.0.1:5000/reload_std_data')
+        assert r.status_code == 200
+        assert not json.loads(r.text)['changed']
+        ### changed file on disk
+        tmp_dir = tempfile.mkdtemp()
+        file_nodes = eao_server.parameters['file_nodes']
+        try:
+            eao_server.parameters['file_nodes'] = join(tmp_dir, 'nodes.json')
+            eao.serialization.to_json(nodes[:2], file_name = eao_server.parameters['file_nodes'])
+            r = client.get('http://127.0.0.1:5000/reload_std_data')
+            assert json.loads(r.text)['changed']
+            r = client.put('http://127.0.0.1:5000/get_data', json = 'std_nodes')
+            assert len(json.loads(json.loads(r.text))) == len(nodes) # until reset
+            r = client.get('http://127.0.0.1:5000/reset')
+            assert len(eao_server.get_obj('std_nodes')) == 2
+        finally:
+            eao_server.parameters['file_nodes'] = file_nodes
+            client.get('http://127.0.0.1:5000/reload_std_data')
+            client.get('http://127.0.0.1:5000/reset')
+            shutil.rmtree(tmp_dir, ignore_errors = True)
+        assert len(eao_server.get_obj('std_nodes')) == len(nodes)
+
+    def test_node_index(self, client):
+        self.set_data(client)
+        index, _ = eao_server.node_index()
+        assert index['portf_node_1'].name == 'portf_node_1'
+        assert eao_server.node_index()[0] is index # cached
+        r = client.put('http://127.0.0.1:5000/add_std_node', json = eao.serialization.to_json(eao.assets.Node('new_node')))
+        assert 'new_node' in eao_server.node_index()[0] # updated
+        ### bulk
+        assets = []
+        for i, n in enumerate(['node_power', 'new_node', 'portf_node_2']):
+            a = json.loads(eao.serialization.to_json(eao.assets.SimpleContract(name = 'c'+str(i), nodes = node1, price = 'p')))
+            a['nodes'] = [n]
+            assets.append(a)
+        r = client.put('http://127.0.0.1:5000/set_nodes_from_list_bulk', json = assets)
+        assert r.status_code == 200
+        res = eao.serialization.load_from_json(r.text)
+        assert [a.nodes[0].name for a in res] == ['node_power', 'new_node', 'portf_node_2']
+        assert res[0].nodes[0].commodity == 'power'
+        assets[1]['nodes'] = ['unknown']
+        r = client.put('http://127.0.0.1:5000/set_nodes_from_list_bulk', json = assets)
+        assert r.status_code == 400
+        assert 'asset 1' in r.text
+
+    def test_portf_per_asset(self, client):
+        self.set_data(client)
+        v = {n: eao_server.data_version(eao_server.asset_key(n)) for n in ['SC_1', 'SC_2', 'SC_3', 'storage']}
+        v_portf = eao_server.data_version('portf')
+        r = client.put('http://127.0.0.1:5000/set_asset_parameter', json = ['SC_2', ['max_cap'], 5.])
+        assert r.status_code == 200
+        # only edited asset stored again
+        assert eao_server.data_version(eao_server.asset_key('SC_2')) > v['SC_2']
+        assert eao_server.data_version(eao_server.asset_key('SC_1')) == v['SC_1']
+        assert eao_server.data_version('portf') > v_portf
+        assert eao_server.data_version('portf_nodes') == eao_server.data_version('portf')
+        ### rename keeps place, delete, add
+        a = json.loads(eao.serialization.to_json(eao_server.get_obj(eao_server.asset_key('SC_3'))))
+        a['name'] = 'SC_3b'
+        r = client.put('http://127.0.0.1:5000/set_all_asset_parameters', json = ['SC_3', a])
+        assert r.status_code == 200
+        r = client.put('http://127.0.0.1:5000/portf_delete_asset', json = 'SC_1')
+        r = client.put('http://127.0.0.1:5000/portf_add_asset', json = eao.serialization.to_json(a2))
+        assert r.status_code == 400 # name exists
+        r = client.get('http://127.0.0.1:5000/get_data_keys')
+        keys = json.loads(r.text)
+        assert 'portf_nodes' in keys and not eao_server.asset_key('SC_2') in keys
+        ### assembled portfolio
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'portf')
+        portf_new = eao.serialization.load_from_json(json.loads(r.text))
+        assert portf_new.asset_names == ['SC_2', 'SC_3b', 'storage']
+        assert portf_new.get_asset('SC_2').max_cap == 5.
+        assert eao_server.get_obj('portf').asset_names == ['SC_2', 'SC_3b', 'storage']
+        assert not eao_server.asset_key('SC_1') in eao_server.get_backend().keys('default')
+        r = client.get('http://127.0.0.1:5000/optimize')
+        assert r.status_code == 200
+        assert 'SC_3b (portf_node_2)' in json.loads(r.text)
+
+    def test_batch_edit(self, client):
+        self.set_data(client)
+        v_sc1 = eao_server.data_version(eao_server.asset_key('SC_1'))
+        v_nodes = eao_server.data_version('std_nodes')
+        new_asset = eao.serialization.to_json(eao.assets.SimpleContract(name = 'SC_new', nodes = node2, price = 'rand_price_1'))
+        ops = [['set_asset_parameter', ['SC_2', ['max_cap'], 3.]],
+               ['portf_add_asset', new_asset],
+               ['set_asset_parameter', ['SC_new', ['max_cap'], 2.]],
+               ['portf_delete_asset', 'SC_3'],
+               ['add_std_node', eao.serialization.to_json(eao.assets.Node('batch_node'))]]
+        r = client.put('http://127.0.0.1:5000/batch_edit', json = ops)
+        assert r.status_code == 200
+        res = json.loads(r.text)
+        assert [o['status'] for o in res['operations']] == ['ok']*5
+        portf_new = eao_server.get_obj('portf')
+        assert portf_new.asset_names == ['SC_1', 'SC_2', 'storage', 'SC_new']
+        assert portf_new.get_asset('SC_new').max_cap == 2.
+        assert eao_server.data_version(eao_server.asset_key('SC_1')) == v_sc1 # untouched
+        assert 'batch_node' in [n.name for n in eao_server.get_obj('std_nodes')]
+        ### all or nothing
+        v_portf, v_nodes = eao_server.data_version('portf'), eao_server.data_version('std_nodes')
+        ops = [['portf_delete_asset', 'SC_1'], ['set_asset_parameter', ['no_asset', ['max_cap'], 1.]], ['del_std_node', 'batch_node']]
+        r = client.put('http://127.0.0.1:5000/batch_edit', json = ops)
+        assert r.status_code == 400
+        res = json.loads(r.text)
+        assert [o['status'] for o in res['operations']] == ['ok', 'failed', 'not applied']
+        assert eao_server.data_version('portf') == v_portf
+        assert eao_server.data_version('std_nodes') == v_nodes
+        assert 'SC_1' in eao_server.get_obj('portf').asset_names
+
+    def test_schema_registry(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/get_schema')
+        assert r.status_code == 200
+        schema = json.loads(r.text)
+        assert 'min_cap' in schema['classes']['SimpleContract']['arguments']
+        assert schema['aliases']['node'] == 'Node'
+        r = client.put('http://127.0.0.1:5000/get_object_details', json = 'node')
+        assert r.status_code == 200
+        assert json.loads(r.text) == schema['classes']['Node']['arguments']
+        r = client.put('http://127.0.0.1:5000/get_object_details', json = 'no_class')
+        assert r.status_code == 400
+        ### details cached per asset version
+        r = client.put('http://127.0.0.1:5000/get_asset_details', json = 'SC_2')
+        assert r.status_code == 200
+        details = json.loads(r.text)
+        assert details['arguments'] == schema['classes']['SimpleContract']['arguments']
+        r = client.put('http://127.0.0.1:5000/set_asset_parameter', json = ['SC_2', ['max_cap'], 7.])
+        r = client.put('http://127.0.0.1:5000/get_asset_details', json = 'SC_2')
+        assert json.loads(r.text)['parameters']['max_cap'] == 7.
+        r = client.get('http://127.0.0.1:5000/get_portf_details')
+        assert r.status_code == 200
+
+    def test_etags(self, client):
+        self.set_data(client)
+        for method, url, arg in [('put', '/get_data', 'portf'), ('get', '/get_data_keys', None), ('get', '/get_network', None),
+                                 ('get', '/get_portf_details', None), ('put', '/get_asset_details', 'SC_1')]:
+            r = getattr(client, method)('http://127.0.0.1:5000'+url, json = arg)
+            assert r.status_code == 200
+            etag = r.headers['ETag']
+            r = getattr(client, method)('http://127.0.0.1:5000'+url, json = arg, headers = {'If-None-Match': etag})
+            assert r.status_code == 304
+            assert r.data == b''
+        ### new version after write
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'timegrid')
+        etag = r.headers['ETag']
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'portf', headers = {'If-None-Match': etag})
+        assert r.status_code == 200 # other key
+        r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid))
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'timegrid', headers = {'If-None-Match': etag})
+        assert r.status_code == 200
+        assert r.headers['ETag'] != etag
+        ### versions restart with new memory backend -- not taken for unchanged data
+        etag, version = r.headers['ETag'], eao_server.data_version('timegrid')
+        eao_server.set_recorder_backend('memory')
+        self.set_data(client)
+        eao_server.backend.counter = itertools.count(version) # same version as before restart
+        r = client.put('http://127.0.0.1:5000/set_timegrid', json=eao.serialization.to_json(timegrid))
+        assert eao_server.data_version('timegrid') == version
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'timegrid', headers = {'If-None-Match': etag})
+        assert r.status_code == 200
+
+    def test_compression(self, client):
+        import gzip
+        self.set_data(client)
+        plain = client.put('http://127.0.0.1:5000/get_data', json = 'portf')
+        assert 'Content-Encoding' not in plain.headers
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'portf', headers = {'Accept-Encoding': 'gzip'})
+        assert r.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(r.data) == plain.data
+        assert r.headers['ETag'].startswith('W/')
+        ### streamed (and compressed) results
+        stream_min_size = eao_server.parameters['stream_min_size']
+        eao_server.parameters['stream_min_size'] = 0
+        try:
+            plain = client.get('http://127.0.0.1:5000/optimize')
+            assert plain.is_streamed
+            res = json.loads(plain.data)
+            assert 'total value' in res and 'time_index' in res
+            r = client.get('http://127.0.0.1:5000/optimize', headers = {'Accept-Encoding': 'gzip'})
+            assert json.loads(gzip.decompress(r.data)) == res
+            zstd_available = eao_server.zstd_available
+            eao_server.zstd_available = False # zstd not offered without zstandard
+            try:
+                r = client.get('http://127.0.0.1:5000/optimize', headers = {'Accept-Encoding': 'zstd, gzip'})
+                assert r.headers['Content-Encoding'] == 'gzip'
+            finally:
+                eao_server.zstd_available = zstd_available
+            if not zstd_available: return
+            import zstandard
+            r = client.get('http://127.0.0.1:5000/optimize', headers = {'Accept-Encoding': 'zstd, gzip'})
+            assert r.headers['Content-Encoding'] == 'zstd'
+            assert json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(r.data)) == res
+        finally:
+            eao_server.parameters['stream_min_size'] = stream_min_size
+
+    def test_get_data_raw(self, client):
+        self.set_data(client)
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'portf')
+        encoded = json.loads(r.text)
+        r = client.put('http://127.0.0.1:5000/get_data?raw=1', json = 'portf')
+        assert r.status_code == 200
+        assert r.mimetype == 'application/json'
+        assert r.text == encoded # no double encoding
+        etag = r.headers['ETag']
+        r = client.put('http://127.0.0.1:5000/get_data', json = 'portf', headers = {'If-None-Match': etag})
+        assert r.status_code == 200 # other representation
+        r = client.put('http://127.0.0.1:5000/get_data?raw=1', json = 'portf_asset_names')
+        assert r.json == [a.name for a in portf.assets]
+        ### several keys
+        r = client.put('http://127.0.0.1:5000/get_data_multi', json = ['portf', 'timegrid', 'portf_asset_names', 'not_there'])
+        assert r.status_code == 200
+        res = r.json
+        assert eao.serialization.load_from_json(json.dumps(res['portf'])).assets[0].name == portf.assets[0].name
+        assert res['timegrid'] == json.loads(json.loads(client.put('http://127.0.0.1:5000/get_data', json = 'timegrid').text))
+        assert res['portf_asset_names'] == [a.name for a in portf.assets]
+        assert res['not_there'] is None
+        etag = r.headers['ETag']
+        r = client.put('http://127.0.0.1:5000/get_data_multi', json = ['portf', 'timegrid', 'portf_asset_names', 'not_there'], headers = {'If-None-Match': etag})
+        assert r.status_code == 304
+        r = client.put('http://127.0.0.1:5000/get_data_multi', json = 'portf')
+        assert r.status_code == 400
+
+    def test_network_cache(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/get_network')
+        assert r.status_code == 200
+        net = json.loads(r.text)
+        assert set(net['position']) == set(n['id'] for n in net['nodes'])
+        body = eao_server.current_workspace()['network']['body']
+        r = client.get('http://127.0.0.1:5000/get_network')
+        assert r.text == body # cached
+        ### parameter edit: same graph, same positions
+        r = client.put('http://127.0.0.1:5000/batch_edit', json = [['set_asset_parameter', ['SC_2', ['max_cap'], 3.]]])
+        assert r.status_code == 200
+        r = client.get('http://127.0.0.1:5000/get_network')
+        assert json.loads(r.text)['position'] == net['position']
+        ### new asset: layout seeded with previous positions
+        new_asset = eao.serialization.to_json(eao.assets.SimpleContract(name = 'SC_new', nodes = node2, price = 'rand_price_1'))
+        r = client.put('http://127.0.0.1:5000/batch_edit', json = [['portf_add_asset', new_asset]])
+        assert r.status_code == 200
+        r = client.get('http://127.0.0.1:5000/get_network')
+        new_net = json.loads(r.text)
+        assert 'SC_new' in new_net['position']
+        assert set(net['position']) < set(new_net['position'])
+
+    def test_job_progress(self, client):
+        self.set_data(client)
+        eao_server.flush_result_cache()
+        r = client.get('http://127.0.0.1:5000/optimize_submit')
+        job_id = json.loads(r.text)
+        r = client.get('http://127.0.0.1:5000/job_progress?job_id='+job_id)
+        assert r.status_code == 200
+        assert r.mimetype == 'text/event-stream'
+        messages = [m for m in r.text.split('\n\n') if m.strip()]
+        events = [dict(l.split(': ', 1) for l in m.split('\n')) for m in messages if not m.startswith(':')]
+        assert events[-1]['event'] == 'end'
+        assert json.loads(events[-1]['data'])['status'] == 'done'
+        phases = [json.loads(e['data']).get('phase') for e in events if e['event'] == 'progress']
+        assert [p for p in phases if p is not None] == ['loading', 'setup', 'solving', 'extracting', 'done']
+        r = client.put('http://127.0.0.1:5000/job_status', json = job_id)
+        assert json.loads(r.text)['phase'] == 'done'
+        ### resume after last event id
+        last = events[-2]['id']
+        r = client.get('http://127.0.0.1:5000/job_progress?job_id='+job_id, headers = {'Last-Event-ID': last})
+        assert 'event: progress' not in r.text
+        assert 'event: end' in r.text
+        r = client.get('http://127.0.0.1:5000/job_progress?job_id=nojob')
+        assert r.status_code == 400
+
+    def test_admission(self, client):
+        self.set_data(client)
+        r = client.get('http://127.0.0.1:5000/estimate_problem')
+        assert r.status_code == 200
+        estimate = json.loads(r.text)
+        assert estimate['exact'] and (estimate['time_steps'] == timegrid.T)
+        assert estimate['variables'] == len(op.c)
+        assert estimate['constraints'] == op.A.shape[0]
+        assert estimate['integers'] == 0
+        assert estimate['admission'] == 'optimize'
+        mip_storage = eao.assets.Storage('mip_storage', nodes = node1, size = 10, cap_in = 1., cap_out = 1., eff_in = 0.9,
+                                         no_simult_in_out = True)
+        mip = eao_server.estimate_problem(eao.portfolio.Portfolio([a2, mip_storage]), timegrid, prices)
+        assert mip['integers'] == timegrid.T
+        ### larger problems estimated from fewer time steps (here: rolling horizon window)
+        estimate_steps = eao_server.parameters['estimate_steps']
+        eao_server.parameters['estimate_steps'] = 10
+        try:
+            estimate = json.loads(client.get('http://127.0.0.1:5000/estimate_problem?window=20').text)
+        finally:
+            eao_server.parameters['estimate_steps'] = estimate_steps
+        assert (estimate['sample_steps'] == 10) and (estimate['time_steps'] == 20) and not estimate['exact']
+        ### admission
+        max_cost = eao_server.parameters['max_cost_optimize'], eao_server.parameters['max_cost_job']
+        try:
+            eao_server.parameters['max_cost_optimize'] = 10
+            r = client.get('http://127.0.0.1:5000/optimize')
+            assert r.status_code == 400
+            assert 'optimize_submit' in r.text
+            r = client.get('http://127.0.0.1:5000/optimize_submit')
+            assert r.status_code == 200
+            eao_server.parameters['max_cost_job'] = 10
+            r = client.get('http://127.0.0.1:5000/optimize_submit')
+            assert r.status_code == 400
+        finally:
+            eao_server.parameters['max_cost_optimize'], eao_server.parameters['max_cost_job'] = max_cost
+        ### rolling horizon: cost of all windows (solved one after the other) decides
+        estimate = json.loads(client.get('http://127.0.0.1:5000/estimate_problem?window=10&overlap=2').text)
+        assert estimate['windows'] == eao_server.n_windows(timegrid.T, 10, 2) == 4 # [0,10), [8,18), [16,26), [24,31)
+        assert estimate['cost'] == 4*estimate['cost_per_window']
+        try:
+            eao_server.parameters['max_cost_optimize'] = estimate['cost_per_window']
+            r = client.get('http://127.0.0.1:5000/optimize?window=10&overlap=2')
+            assert r.status_code == 400
+            assert 'optimize_submit' in r.text
+        finally:
+            eao_server.parameters['max_cost_optimize'] = max_cost[0]
+        r = client.get('http://127.0.0.1:5000/estimate_problem?window=10&overlap=10')
+        assert r.status_code == 400
+        ### solver limits
+        import cvxpy
+        solve = cvxpy.Problem.solve
+        r = client.get('http://127.0.0.1:5000/optimize?time_limit=60&mip_gap=0.01')
+        assert r.status_code == 400 # LP: solver chosen by cvxpy, limits cannot be applied
+        r = client.put('http://127.0.0.1:5000/set_solver', json = 'HIGHS')
+        r = client.get('http://127.0.0.1:5000/optimize?time_limit=60&mip_gap=0.01')
+        assert r.status_code == 200
+        assert cvxpy.Problem.solve is solve # wrapped only while solving
+        r = client.put('http://127.0.0.1:5000/set_solver', json = 'standard')
+        assert eao_server.solver_kwargs('SCIP', {'time_limit': 60., 'mip_gap': 0.01}) == {'scip_params': {'limits/time': 60., 'limits/gap': 0.01}}
+        r = client.get('http://127.0.0.1:5000/optimize?time_limit=-1')
+        assert r.status_code == 400
+
     def test_run_through(self, client):
         #############################################################
         ### define test data   ######################################
@@ -51,6 +51,12 @@ r = requests.put('http://127.0.0.1:5000/get_data', json = 'std_nodes')
 obj_std_nodes = eao.serialization.load_from_json(json.loads(r.text))
 print('****nodes:')
 for n in obj_std_nodes: print(n.name)
+# same, stored JSON sent unchanged (no double encoding)
+r = requests.put('http://127.0.0.1:5000/get_data?raw=1', json = 'std_nodes')
+obj_std_nodes = eao.serialization.load_from_json(r.text)
+# several data sets in one request
+r = requests.put('http://127.0.0.1:5000/get_data_multi', json = ['std_nodes', 'std_assets'])
+std_data = r.json()
 #############################################################
 
 
@@ -111,6 +117,13 @@ l = {}
 for k in prices:
     l[k] = list(prices[k])
 r = requests.put('http://127.0.0.1:5000/set_time_series_data', json=l)
+## binary version ... fast for large data sets (no JSON parsing)
+## also possible: application/x-npy, Arrow IPC (pyarrow) or raw float64 (application/octet-stream)
+import io
+buf = io.BytesIO()
+np.savez(buf, **prices)
+r = requests.put('http://127.0.0.1:5000/set_time_series_data', data=buf.getvalue(), 
+                 headers={'Content-Type': 'application/x-npz'})
 
 #### do optimization
 r = requests.get('http://127.0.0.1:5000/optimize')